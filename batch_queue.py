@@ -0,0 +1,149 @@
+import os
+import threading
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+STATUSES = (PENDING, RUNNING, DONE, FAILED)
+
+
+class BatchItem:
+    __slots__ = ("path", "name", "source_root", "status", "duration", "error")
+
+    def __init__(self, path, source_root=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        # Folder the item was ingested from, used to mirror the tree in the output
+        self.source_root = source_root
+        self.status = PENDING
+        self.duration = None
+        self.error = None
+
+
+class BatchQueue:
+    # Ordered store of batch items with O(1) lookup by path and by position.
+    # Shared between the Tk thread (add/remove/render) and the batch thread
+    # (status updates), so every method takes the lock.
+
+    def __init__(self):
+        self._items = []
+        self._positions = {}
+        self._counts = dict.fromkeys(STATUSES, 0)
+        self._lock = threading.RLock()
+        # Position from which claim_next() looks for pending items
+        self._claim_cursor = 0
+        # Bumped on every change so views can skip redundant redraws
+        self.version = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __iter__(self):
+        # Iterate over a snapshot so callers don't hold the lock
+        with self._lock:
+            return iter(list(self._items))
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __contains__(self, path):
+        return path in self._positions
+
+    def paths(self):
+        with self._lock:
+            return [item.path for item in self._items]
+
+    def slice(self, start, stop):
+        with self._lock:
+            return self._items[start:stop]
+
+    def counts(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def add_many(self, paths, source_root=None):
+        # Returns the number of paths that were not already queued
+        added = 0
+        with self._lock:
+            for path in paths:
+                if path in self._positions:
+                    continue
+                self._positions[path] = len(self._items)
+                self._items.append(BatchItem(path, source_root))
+                added += 1
+            self._counts[PENDING] += added
+            if added:
+                self.version += 1
+        return added
+
+    def remove_indices(self, indices):
+        # One pass over the list regardless of how many rows are removed
+        doomed = set(indices)
+        if not doomed:
+            return 0
+        with self._lock:
+            kept = []
+            for i, item in enumerate(self._items):
+                if i in doomed:
+                    self._counts[item.status] -= 1
+                else:
+                    kept.append(item)
+            removed = len(self._items) - len(kept)
+            self._items = kept
+            self._positions = {item.path: i for i, item in enumerate(kept)}
+            self._claim_cursor = 0
+            self.version += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._items = []
+            self._positions = {}
+            self._counts = dict.fromkeys(STATUSES, 0)
+            self._claim_cursor = 0
+            self.version += 1
+
+    def reset_status(self):
+        with self._lock:
+            for item in self._items:
+                item.status = PENDING
+                item.duration = None
+                item.error = None
+            self._counts = dict.fromkeys(STATUSES, 0)
+            self._counts[PENDING] = len(self._items)
+            self._claim_cursor = 0
+            self.version += 1
+
+    def claim_next(self):
+        # Hand the next pending item to a worker and mark it running. Items added
+        # while a batch is running are picked up as well.
+        with self._lock:
+            while self._claim_cursor < len(self._items):
+                item = self._items[self._claim_cursor]
+                self._claim_cursor += 1
+                if item.status == PENDING:
+                    self._counts[PENDING] -= 1
+                    self._counts[RUNNING] += 1
+                    item.status = RUNNING
+                    self.version += 1
+                    return item
+            return None
+
+    def set_status(self, path, status, duration=None, error=None):
+        with self._lock:
+            position = self._positions.get(path)
+            if position is None:
+                # Removed from the queue while it was being processed
+                return
+            item = self._items[position]
+            self._counts[item.status] -= 1
+            self._counts[status] += 1
+            item.status = status
+            item.duration = duration
+            item.error = error
+            self.version += 1
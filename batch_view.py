@@ -0,0 +1,160 @@
+import tkinter as tk
+from tkinter import ttk
+
+from batch_queue import DONE, FAILED, RUNNING
+
+STATUS_COLORS = {
+    RUNNING: "#1f6fb2",
+    DONE: "#2e7d32",
+    FAILED: "#c62828",
+}
+
+
+class VirtualListView(ttk.Frame):
+    # Listbox replacement that only draws the rows currently visible, so the
+    # cost of a redraw doesn't depend on how many items are queued
+
+    def __init__(self, parent, queue, row_height=20, thumbnails=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.queue = queue
+        self.text_row_height = row_height
+        self.row_height = row_height
+        self.thumbnails = None
+        self.first_row = 0
+        self.selection = set()
+        self.anchor = None
+        self._drawn_version = None
+
+        self.canvas = tk.Canvas(self, bg="white", highlightthickness=1, highlightbackground="gray")
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.canvas.bind("<Configure>", lambda event: self.refresh(force=True))
+        self.canvas.bind("<ButtonPress-1>", self.on_click)
+        self.canvas.bind("<Shift-ButtonPress-1>", self.on_shift_click)
+        self.canvas.bind("<Control-ButtonPress-1>", self.on_control_click)
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_rows(3))
+
+        self.set_thumbnails(thumbnails)
+
+    def set_thumbnails(self, thumbnails):
+        # Rows grow to fit the thumbnail when thumbnails are shown
+        self.thumbnails = thumbnails
+        if thumbnails:
+            self.row_height = max(self.text_row_height, thumbnails.size[1] + 6)
+        else:
+            self.row_height = self.text_row_height
+        self.refresh(force=True)
+
+    # Geometry
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def max_first_row(self):
+        return max(0, len(self.queue) - self.visible_rows())
+
+    def row_at(self, y):
+        row = self.first_row + y // self.row_height
+        return row if row < len(self.queue) else None
+
+    # Scrolling
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.first_row = int(float(args[1]) * len(self.queue))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible_rows()
+            self.first_row += amount
+        self.first_row = min(max(0, self.first_row), self.max_first_row())
+        self.refresh(force=True)
+
+    def scroll_rows(self, amount):
+        self.yview("scroll", amount, "units")
+
+    def on_mouse_wheel(self, event):
+        self.scroll_rows(-1 if event.delta > 0 else 1)
+
+    # Selection (same semantics as a Listbox with selectmode=EXTENDED)
+    def on_click(self, event):
+        row = self.row_at(event.y)
+        self.selection = {row} if row is not None else set()
+        self.anchor = row
+        self.refresh(force=True)
+
+    def on_shift_click(self, event):
+        row = self.row_at(event.y)
+        if row is None:
+            return
+        anchor = self.anchor if self.anchor is not None else row
+        self.selection = set(range(min(anchor, row), max(anchor, row) + 1))
+        self.refresh(force=True)
+        return "break"
+
+    def on_control_click(self, event):
+        row = self.row_at(event.y)
+        if row is None:
+            return
+        self.selection ^= {row}
+        self.anchor = row
+        self.refresh(force=True)
+        return "break"
+
+    def curselection(self):
+        return tuple(sorted(self.selection))
+
+    def clear_selection(self):
+        self.selection = set()
+        self.anchor = None
+
+    # Drawing
+    def describe(self, item):
+        text = item.name
+        if item.status != "pending":
+            text = f"{text}  [{item.status}"
+            if item.duration is not None:
+                text += f", {item.duration:.1f}s"
+            text += "]"
+        return text
+
+    def refresh(self, force=False):
+        if not force and self._drawn_version == self.queue.version:
+            return
+        self._drawn_version = self.queue.version
+
+        self.first_row = min(self.first_row, self.max_first_row())
+        rows = self.visible_rows()
+        items = self.queue.slice(self.first_row, self.first_row + rows + 1)
+        width = self.canvas.winfo_width()
+
+        text_x = 4
+        if self.thumbnails:
+            text_x += self.thumbnails.size[0] + 6
+
+        self.canvas.delete("all")
+        for offset, item in enumerate(items):
+            row = self.first_row + offset
+            y = offset * self.row_height
+            if row in self.selection:
+                self.canvas.create_rectangle(0, y, width, y + self.row_height, fill="#cce4f7", outline="")
+            if self.thumbnails:
+                photo = self.thumbnails.get(item.path)
+                if photo is not None:
+                    self.canvas.create_image(4 + self.thumbnails.size[0] // 2, y + self.row_height // 2,
+                                             image=photo, anchor=tk.CENTER)
+            self.canvas.create_text(text_x, y + self.row_height // 2, anchor=tk.W, text=self.describe(item),
+                                    fill=STATUS_COLORS.get(item.status, "black"))
+
+        # Only rows on screen are ever thumbnailed
+        if self.thumbnails:
+            self.thumbnails.request([item.path for item in items])
+
+        total = len(self.queue)
+        if total:
+            self.scrollbar.set(self.first_row / total, min(1.0, (self.first_row + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ocr_engine
+from bench_ocr_profiles import make_page
+
+# A4 at 600 DPI
+PAGE_SIZE_600_DPI = (4960, 7016)
+
+
+def synthetic_page(seed=1234):
+    import random
+
+    image, _ = make_page(random.Random(seed), lines=60, width=PAGE_SIZE_600_DPI[0], font_size=56)
+    page = Image.new("L", PAGE_SIZE_600_DPI, 255)
+    page.paste(image, (0, 0))
+    return page
+
+
+def time_png(image, repeats):
+    # What pytesseract does for a PIL image: PNG-encode to a temp file
+    sizes = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+            path = f.name
+        image.save(path, format="PNG")
+        sizes.append(os.path.getsize(path))
+        os.remove(path)
+    return (time.perf_counter() - start) / repeats, sizes[0]
+
+
+def time_pnm(image, repeats):
+    sizes = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        with ocr_engine.handoff_file(image) as path:
+            sizes.append(os.path.getsize(path))
+    return (time.perf_counter() - start) / repeats, sizes[0]
+
+
+def time_ocr(image_or_path, lang, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        ocr_engine.image_to_string(image_or_path, lang=lang)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes written and time spent handing a page to Tesseract")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--ocr", action="store_true", help="also time full OCR calls (needs tesseract)")
+    parser.add_argument("--lang", default="eng")
+    args = parser.parse_args()
+
+    gray = synthetic_page()
+    variants = {
+        "grayscale": gray,
+        "binarized": gray.point(lambda x: 0 if x < 127 else 255, "1"),
+    }
+
+    print(f"handoff directory: {ocr_engine.handoff_dir()}")
+    print(f"{'image':<10} {'png bytes':>12} {'png ms':>8} {'pnm bytes':>12} {'pnm ms':>8} {'saved ms':>9}")
+    for name, image in variants.items():
+        png_time, png_bytes = time_png(image, args.repeats)
+        pnm_time, pnm_bytes = time_pnm(image, args.repeats)
+        print(f"{name:<10} {png_bytes:>12,} {png_time * 1000:>8.1f} {pnm_bytes:>12,} {pnm_time * 1000:>8.1f} "
+              f"{(png_time - pnm_time) * 1000:>9.1f}")
+
+    if args.ocr:
+        import pytesseract
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "page.png")
+            gray.save(source)
+
+            with Image.open(source) as image:
+                image.load()
+                png_roundtrip = time.perf_counter()
+                for _ in range(args.repeats):
+                    pytesseract.image_to_string(image, lang=args.lang)
+                png_roundtrip = (time.perf_counter() - png_roundtrip) / args.repeats
+
+            print(f"OCR via pytesseract PNG temp file: {png_roundtrip * 1000:8.1f} ms/page")
+            print(f"OCR via PNM handoff:               {time_ocr(gray, args.lang, args.repeats) * 1000:8.1f} ms/page")
+            print(f"OCR via original file passthrough: {time_ocr(source, args.lang, args.repeats) * 1000:8.1f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
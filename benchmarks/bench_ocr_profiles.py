@@ -0,0 +1,78 @@
+import argparse
+import difflib
+import os
+import random
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+import pytesseract
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_profiles import build_tesseract_config, profile_names
+
+WORDS = (
+    "invoice total amount payment due date account number customer reference order "
+    "quantity price description tax shipping address received balance statement period "
+    "signature approved department office report summary january february march april"
+).split()
+
+
+def load_font(size):
+    for name in ("DejaVuSans.ttf", "Arial.ttf", "LiberationSans-Regular.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def make_page(rng, lines=30, words_per_line=8, width=1700, font_size=28):
+    # Render random words onto a white page, roughly A4 at 200 DPI
+    font = load_font(font_size)
+    text_lines = [" ".join(rng.choice(WORDS) for _ in range(words_per_line)) for _ in range(lines)]
+    height = 100 + lines * int(font_size * 1.6)
+
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    y = 50
+    for line in text_lines:
+        draw.text((60, y), line, fill=0, font=font)
+        y += int(font_size * 1.6)
+
+    return image, "\n".join(text_lines)
+
+
+def char_accuracy(expected, actual):
+    expected = " ".join(expected.split())
+    actual = " ".join(actual.split())
+    return difflib.SequenceMatcher(None, expected, actual).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR profiles on a synthetic corpus")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--models-dir", default="", help="directory containing tessdata_fast / tessdata_best")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [make_page(rng) for _ in range(args.pages)]
+
+    print(f"{'profile':<10} {'pages/sec':>10} {'char acc':>10}  config")
+    for profile in profile_names():
+        config = build_tesseract_config(profile, args.models_dir)
+        accuracies = []
+        start = time.perf_counter()
+        for image, expected in corpus:
+            text = pytesseract.image_to_string(image, lang=args.lang, config=config)
+            accuracies.append(char_accuracy(expected, text))
+        elapsed = time.perf_counter() - start
+
+        print(f"{profile:<10} {len(corpus) / elapsed:>10.2f} {sum(accuracies) / len(accuracies):>10.3f}  {config}")
+
+
+if __name__ == "__main__":
+    main()
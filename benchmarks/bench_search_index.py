@@ -0,0 +1,92 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex
+
+# Zipf-like vocabulary: a few very common words and a long tail of rare ones
+COMMON_WORDS = ("the and of to in is that for it with as was on are this be by from at or have an not which but "
+                "invoice total amount date page account number payment customer order due balance reference").split()
+
+QUERIES = (
+    "invoice",
+    "payment AND customer",
+    '"total amount"',
+    "acc*",
+    "rare0042",
+    "rare0042 OR rare1337",
+)
+
+
+def make_text(rng, words=300, rare_words=20000):
+    return " ".join(rng.choice(COMMON_WORDS) if rng.random() < 0.9 else f"rare{rng.randrange(rare_words):04d}"
+                    for _ in range(words))
+
+
+def build(index, pages, chunk, rng):
+    start = time.perf_counter()
+    for first in range(0, pages, chunk):
+        records = [(f"/scans/box{n // 1000:04d}/page{n:07d}.tif", make_text(rng), f"/out/page{n:07d}.docx", 1,
+                    "eng") for n in range(first, min(pages, first + chunk))]
+        index.add_many(records)
+        done = min(pages, first + chunk)
+        elapsed = time.perf_counter() - start
+        print(f"\r{done:>10,} pages indexed, {done / elapsed:8.0f} pages/s", end="", flush=True)
+    print()
+    return time.perf_counter() - start
+
+
+def time_queries(index, repeats):
+    print(f"{'query':<26} {'order':<7} {'hits':>6} {'median ms':>10} {'p95 ms':>8}")
+    for query in QUERIES:
+        for order in ("rank", "recent"):
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                results = index.search(query, limit=20, order=order)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{query:<26} {order:<7} {len(results):>6} {statistics.median(timings):>10.2f} {p95:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexing throughput and query latency of the search index")
+    parser.add_argument("--pages", type=int, default=100000, help="pages to index (the target is 1000000)")
+    parser.add_argument("--chunk", type=int, default=10000, help="pages per transaction")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--index", help="index file to build (default: a temporary file)")
+    parser.add_argument("--incremental", type=int, default=10000,
+                        help="pages to re-add unchanged afterwards, to time the content-hash skip")
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(args.index or os.path.join(tmp, "index.sqlite3"))
+        elapsed = build(index, args.pages, args.chunk, rng)
+        size = os.path.getsize(index.path)
+        print(f"indexed {args.pages:,} pages in {elapsed:.1f}s ({args.pages / elapsed:.0f} pages/s), "
+              f"{size / 1e6:.0f} MB on disk")
+
+        # Unchanged pages are skipped on their content hash
+        rng = random.Random(1234)
+        count = min(args.incremental, args.pages)
+        records = [(f"/scans/box{n // 1000:04d}/page{n:07d}.tif", make_text(rng), f"/out/page{n:07d}.docx", 1, "eng")
+                   for n in range(count)]
+        start = time.perf_counter()
+        changed = index.add_many(records)
+        elapsed = time.perf_counter() - start
+        print(f"re-added {count:,} unchanged pages in {elapsed:.2f}s ({changed} rewritten)")
+
+        time_queries(index, args.repeats)
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, REPO_DIR)
+
+import env_probe
+
+# Runs in a fresh interpreter so module imports are really paid for each time.
+# Needs a display; on a headless machine run under xvfb-run.
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {repo!r})
+import tkinter as tk
+import version2
+imported = time.perf_counter()
+
+root = tk.Tk()
+app = version2.OCRtoWordGUI(root)
+root.update()
+window = time.perf_counter()
+
+ready = {{}}
+app.on_environment_ready = lambda info: ready.setdefault("at", time.perf_counter())
+app.start_warm_up()
+while "at" not in ready:
+    root.update()
+    time.sleep(0.001)
+
+print(json.dumps({{"import": imported - start, "window": window - start, "ready": ready["at"] - start}}))
+root.destroy()
+"""
+
+
+def run_once():
+    output = subprocess.run([sys.executable, "-c", CHILD.format(repo=REPO_DIR)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(label, runs):
+    for key in ("import", "window", "ready"):
+        values = [run[key] * 1000 for run in runs]
+        print(f"{label:<6} {key:<8} median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold and warm GUI start times")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Cold: no cached Tesseract probe, so startup has to run tesseract --version/--list-langs
+    cold = []
+    for _ in range(args.runs):
+        env_probe.clear_cache()
+        cold.append(run_once())
+
+    # Warm: probe served from the on-disk cache
+    env_probe.get_environment()
+    warm = [run_once() for _ in range(args.runs)]
+
+    summarize("cold", cold)
+    summarize("warm", warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import os
+import sys
+import tempfile
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from version2 import OCRtoWordGUI
+
+# Scripted interactions with a loaded page, one every STEP_MS, while the
+# latency monitor watches the event loop. Run it under a virtual display:
+#   xvfb-run -a python benchmarks/check_ui_latency.py --max-stall-ms 500
+STEP_MS = 300
+
+
+def make_page(path, width, height):
+    from PIL import Image, ImageDraw
+
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for y in range(100, height - 100, 60):
+        draw.text((100, y), "The quick brown fox jumps over the lazy dog " * 4, fill=0)
+    image.save(path)
+
+
+def actions(app, image_path):
+    yield "load", lambda: app.load_image(image_path)
+    for _ in range(3):
+        yield "zoom in", app.zoom_in
+    yield "rotate", app.rotate_cw
+    yield "rotate", app.rotate_ccw
+    yield "fit", app.zoom_fit
+    yield "contrast", lambda: app.contrast.set(1.5)
+    yield "apply processing", app.apply_image_processing
+    yield "reset processing", app.reset_image_processing
+    yield "switch tab", lambda: app.notebook.select(app.batch_tab)
+    yield "switch tab", lambda: app.notebook.select(app.main_tab)
+
+
+def as_handler(name, action):
+    # A Tk callback of its own that the monitor reports by the action's name,
+    # rather than as part of the step that scheduled it
+    def handler():
+        action()
+    handler.__qualname__ = f"action '{name}'"
+    return handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event loop stalls of the GUI during common interactions")
+    parser.add_argument("--width", type=int, default=2480, help="test page size (default: A4 at 300 dpi)")
+    parser.add_argument("--height", type=int, default=3508)
+    parser.add_argument("--max-stall-ms", type=float, default=1000,
+                        help="fail if the event loop is ever blocked for longer")
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"No display ({e}); run under xvfb-run", file=sys.stderr)
+        return 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = os.path.join(tmp, "page.png")
+        make_page(image_path, args.width, args.height)
+
+        app = OCRtoWordGUI(root)
+        steps = actions(app, image_path)
+
+        def next_step():
+            try:
+                name, action = next(steps)
+            except StopIteration:
+                root.after(STEP_MS, root.quit)
+                return
+            root.after(0, as_handler(name, action))
+            root.after(STEP_MS, next_step)
+
+        root.after(STEP_MS, next_step)
+        root.mainloop()
+        app.speculator.close()
+        app.monitor.uninstall()
+        root.destroy()
+
+    monitor = app.monitor
+    print(monitor.report())
+    print(f"Worst stall: {monitor.worst_ms:.0f} ms in {monitor.worst_handler or '-'}")
+    if monitor.worst_ms > args.max_stall_ms:
+        print(f"FAIL: worst stall above {args.max_stall_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
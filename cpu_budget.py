@@ -0,0 +1,137 @@
+import logging
+import math
+import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Tesseract's LSTM engine stops scaling after a few OpenMP threads, so per-call
+# threads are capped and the remaining cores are used for parallel pages instead
+MAX_OMP_THREADS = 4
+
+# Interactive jobs (preview, single conversion) only ever OCR one image at a time
+INTERACTIVE_JOBS = ("preview", "single")
+
+CpuPlan = namedtuple("CpuPlan", ["job_type", "cpus", "workers", "omp_threads"])
+
+
+def affinity_cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def cgroup_cpu_quota():
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    # cgroup v1
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def available_cpus():
+    cpus = affinity_cpu_count()
+    quota = cgroup_cpu_quota()
+    if quota:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def omp_threads_for(cpus):
+    # Leave enough cores for several pages in flight on bigger machines
+    return max(1, min(MAX_OMP_THREADS, cpus // 4))
+
+
+def plan_for(job_type, cpus=None):
+    if cpus is None:
+        cpus = available_cpus()
+
+    omp_threads = omp_threads_for(cpus)
+    if job_type in INTERACTIVE_JOBS:
+        workers = 1
+    else:
+        workers = max(1, cpus // omp_threads)
+
+    return CpuPlan(job_type, cpus, workers, omp_threads)
+
+
+class CpuBudget:
+    # Shared across every OCR call in the process so the preview, convert and
+    # batch threads together never run more Tesseract processes than there are
+    # cores for
+
+    def __init__(self, cpus=None, slots=None):
+        self.cpus = cpus or available_cpus()
+        self.omp_threads = omp_threads_for(self.cpus)
+        self.slots = slots or max(1, self.cpus // self.omp_threads)
+        self._semaphore = threading.BoundedSemaphore(self.slots)
+        self._lock = threading.Lock()
+        self.in_use = 0
+
+        # Tesseract reads this when it starts, and child processes inherit it
+        os.environ["OMP_THREAD_LIMIT"] = str(self.omp_threads)
+
+        logger.info("CPU budget: %d cpus, %d OCR slots, OMP_THREAD_LIMIT=%d",
+                    self.cpus, self.slots, self.omp_threads)
+
+    def plan(self, job_type):
+        plan = plan_for(job_type, self.cpus)
+        logger.info("CPU plan for %s: %d worker(s) x %d OMP thread(s) on %d cpus",
+                    plan.job_type, plan.workers, plan.omp_threads, plan.cpus)
+        return plan
+
+    @contextmanager
+    def slot(self):
+        self._semaphore.acquire()
+        with self._lock:
+            self.in_use += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._semaphore.release()
+
+    def full(self):
+        # Whether a new slot() would have to wait, as of now
+        with self._lock:
+            return self.in_use >= self.slots
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_budget():
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = CpuBudget()
+        return _budget
+
+
+def set_budget(budget):
+    # For OCR worker processes, which get their share of the parent's budget
+    global _budget
+    with _budget_lock:
+        _budget = budget
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached fields change
+CACHE_VERSION = 1
+
+
+def cache_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ocr-to-word")
+
+
+def cache_path():
+    return os.path.join(cache_dir(), "environment.json")
+
+
+def tesseract_command():
+    # Same lookup order as pytesseract: explicit override, then PATH
+    command = os.environ.get("TESSERACT_CMD") or "tesseract"
+    return shutil.which(command) or command
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+        return [st.st_size, st.st_mtime_ns]
+    except OSError:
+        return None
+
+
+def _run(args):
+    result = subprocess.run(args, capture_output=True, text=True, timeout=30)
+    # Older Tesseract versions print --version to stderr
+    return result.stdout + result.stderr
+
+
+def probe_tesseract(command):
+    info = {"command": command, "version": None, "languages": [], "tessdata_dir": None, "error": None}
+    try:
+        version_output = _run([command, "--version"])
+        if not version_output.strip():
+            info["error"] = f"Could not run Tesseract: {command} --version printed nothing"
+            return info
+        match = re.search(r"tesseract\s+v?(\S+)", version_output, re.IGNORECASE)
+        info["version"] = match.group(1) if match else version_output.strip().splitlines()[0]
+
+        # First line: List of available languages in "/usr/share/tessdata/" (3):
+        langs_output = _run([command, "--list-langs"]).strip().splitlines()
+        if langs_output:
+            match = re.search(r'"(.+)"', langs_output[0])
+            if match:
+                info["tessdata_dir"] = match.group(1)
+        info["languages"] = sorted(line.strip() for line in langs_output[1:] if line.strip())
+    except FileNotFoundError:
+        info["error"] = f"Tesseract not found ({command}). Install it or set TESSERACT_CMD."
+    except (OSError, subprocess.SubprocessError) as e:
+        info["error"] = f"Could not run Tesseract: {e}"
+    return info
+
+
+def validation_key(info_or_command, tessdata_dir=None):
+    # Changing the binary or adding/removing a traineddata file invalidates the cache
+    if isinstance(info_or_command, dict):
+        command = info_or_command["command"]
+        tessdata_dir = info_or_command.get("tessdata_dir")
+    else:
+        command = info_or_command
+    return {
+        "version": CACHE_VERSION,
+        "command": command,
+        "binary": _stat_key(command),
+        "tessdata_prefix": os.environ.get("TESSDATA_PREFIX"),
+        "tessdata": _stat_key(tessdata_dir) if tessdata_dir else None,
+    }
+
+
+def load_cached(command):
+    try:
+        with open(cache_path(), encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    info = cached.get("info")
+    if not info or info.get("command") != command:
+        return None
+    if cached.get("key") != validation_key(info):
+        return None
+    return info
+
+
+def save_cached(info):
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        tmp_path = cache_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": validation_key(info), "info": info}, f, indent=2)
+        os.replace(tmp_path, cache_path())
+    except OSError as e:
+        logger.warning("Could not write environment cache: %s", e)
+
+
+def get_environment(refresh=False):
+    # Tesseract version and installed languages, probed once and then served from disk
+    command = tesseract_command()
+    if not refresh:
+        info = load_cached(command)
+        if info is not None:
+            return info
+
+    info = probe_tesseract(command)
+    # Failures are not cached so installing Tesseract takes effect on the next start
+    if not info["error"]:
+        save_cached(info)
+    return info
+
+
+def clear_cache():
+    try:
+        os.remove(cache_path())
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,69 @@
+import fnmatch
+import os
+
+# Same extensions the file dialogs offer
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif')
+
+
+def split_patterns(text):
+    # "*.png; scans/*" -> ["*.png", "scans/*"]
+    return [pattern.strip() for pattern in text.replace(",", ";").split(";") if pattern.strip()]
+
+
+def matches_any(rel_path, name, patterns):
+    # Patterns without a slash match the file name, others the path relative to the root
+    for pattern in patterns:
+        target = rel_path if "/" in pattern else name
+        if fnmatch.fnmatch(target, pattern):
+            return True
+    return False
+
+
+def iter_image_files(root, include=(), exclude=(), extensions=IMAGE_EXTENSIONS):
+    # Walk the tree lazily with os.scandir and yield image paths as they are found,
+    # so callers can start working before the whole tree has been listed
+    stack = [(root, "")]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            # Files and subdirectories in name order for a stable, predictable
+            # queue order; scandir lists them in whatever order the file system keeps
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            # Unreadable directory; skip it rather than abort the whole walk
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if exclude and matches_any(rel_path, entry.name, exclude):
+                continue
+
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.path, rel_path))
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+
+            if not entry.name.lower().endswith(extensions):
+                continue
+            if include and not matches_any(rel_path, entry.name, include):
+                continue
+            yield entry.path
+
+        stack.extend(reversed(subdirs))
+
+
+def iter_chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,144 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from ocr_engine import number_from_env
+
+logger = logging.getLogger(__name__)
+
+# Memory for decoded images and their processed variants, in MB
+ENV_VAR = "OCR_IMAGE_CACHE_MB"
+DEFAULT_BUDGET_MB = 512
+
+# Bytes per pixel of PIL's in-memory formats (RGB is stored padded to 4 bytes)
+BYTES_PER_PIXEL = {"1": 1, "L": 1, "P": 1, "I;16": 2, "LA": 4, "RGB": 4, "RGBA": 4, "CMYK": 4, "YCbCr": 4,
+                   "I": 4, "F": 4}
+
+
+def image_bytes(image):
+    return image.width * image.height * BYTES_PER_PIXEL.get(image.mode, 4)
+
+
+def _value_bytes(value):
+    # Variants may carry extra information alongside the image, e.g. (image, orientation)
+    if isinstance(value, tuple):
+        return image_bytes(value[0])
+    return image_bytes(value)
+
+
+def _file_key(path):
+    # A file that changes on disk gets new entries; the old ones age out
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def decode(path):
+    # The file is closed again as soon as the pixels are in memory
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.load()
+    return image
+
+
+class ImageStore:
+    # Decoded images and processed variants of them, shared by the preview,
+    # text preview and conversions, in one LRU bounded by memory use. Cached
+    # images are shared between threads: treat them as read-only (PIL
+    # operations return new images, so only in-place edits need a copy()).
+
+    def __init__(self, budget_bytes=None):
+        if budget_bytes is None:
+            budget_bytes = int(number_from_env(ENV_VAR, DEFAULT_BUDGET_MB) * 1024 * 1024)
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cached(self, path):
+        # Whether the decoded image at path is in memory, without counting a lookup
+        key = _file_key(path) + ("original",)
+        with self._lock:
+            return key in self._entries
+
+    def get(self, path):
+        # The decoded image at path
+        return self._get_or_build(_file_key(path) + ("original",), lambda: decode(path))
+
+    def variant(self, path, key, build):
+        # A derived image (or (image, info) tuple) of the file at path; key must
+        # capture everything build depends on, e.g. the processing settings
+        return self._get_or_build(_file_key(path) + (key,), build)
+
+    def _get_or_build(self, key, build):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        # Built outside the lock; two threads asking for the same image at once both build it
+        value = build()
+        size = _value_bytes(value)
+        if size > self.budget_bytes:
+            return value
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value
+                self.current_bytes += size
+            while self.current_bytes > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= _value_bytes(evicted)
+                self.evictions += 1
+        return value
+
+    def discard(self, path):
+        # Drop every entry for path, e.g. when it was removed from a batch
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                self.current_bytes -= _value_bytes(self._entries.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def describe(self):
+        stats = self.stats()
+        return (f"Image cache: {stats['entries']} images, {stats['bytes'] / (1 << 20):.0f}/"
+                f"{stats['budget_bytes'] / (1 << 20):.0f} MB, {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%}), {stats['evictions']} evicted")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ImageStore()
+        return _store
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from ocr_pipeline import FORMAT_SETTINGS, merge_settings
+
+JOB_KINDS = ("single", "batch", "extract", "queue")
+
+
+def new_job_id():
+    # Sorts by creation time, like work queue item ids
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def _options_key(options):
+    data = json.dumps(options, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def _file_key(settings_key, path):
+    stat = os.stat(path)
+    data = f"{settings_key}|{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    # Everything a job needs, captured once when it is submitted (on the Tk
+    # thread in the GUI) and never changed afterwards. Workers read settings
+    # from here instead of from Tk variables, so a batch runs with the settings
+    # it was started with even if the user keeps editing them.
+    kind: str
+    # Sorted (name, value) pairs: hashable, picklable and JSON-friendly
+    options: tuple
+    inputs: tuple = ()
+    output: str = ""
+    output_kind: str = "directory"
+    job_id: str = field(default_factory=new_job_id)
+    created_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def create(cls, kind, settings, inputs=(), output="", output_kind="directory"):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        return cls(kind=kind, options=tuple(sorted(merge_settings(settings).items())),
+                   inputs=tuple(inputs), output=output, output_kind=output_kind)
+
+    @property
+    def settings(self):
+        # A fresh dict each time, so callers can't change the spec through it
+        return dict(self.options)
+
+    @property
+    def settings_key(self):
+        # Identifies the settings alone; equal for jobs that would produce the same output
+        return _options_key(self.options)
+
+    def cache_key(self, path):
+        # Result cache key for one input under this spec; changes when the file does
+        return _file_key(self.settings_key, path)
+
+    def text_key(self, path):
+        # Like cache_key, but for the OCR text only: jobs that differ just in
+        # document formatting read the same text
+        options = tuple((name, value) for name, value in self.options if name not in FORMAT_SETTINGS)
+        return _file_key(_options_key(options), path)
+
+    def describe(self):
+        settings = self.settings
+        return (f"{self.kind} job {self.job_id}: {len(self.inputs)} inputs, "
+                f"language {settings['language']}, profile {settings['ocr_profile']}, "
+                f"settings {self.settings_key}")
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "settings": self.settings,
+            "settings_key": self.settings_key,
+            "inputs": list(self.inputs),
+            "output": self.output,
+            "output_kind": self.output_kind,
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(kind=data["kind"], options=tuple(sorted(merge_settings(data["settings"]).items())),
+                   inputs=tuple(data.get("inputs", ())), output=data.get("output", ""),
+                   output_kind=data.get("output_kind", "directory"), job_id=data["job_id"],
+                   created_at=data.get("created_at", time.time()))
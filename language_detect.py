@@ -0,0 +1,97 @@
+import logging
+import re
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Languages offered by the GUI, by the script Tesseract OSD reports for them
+SCRIPT_LANGUAGES = {
+    "Latin": ("eng", "spa", "fra", "deu", "ita", "por", "nld", "tur", "pol", "ces"),
+    "Cyrillic": ("rus",),
+    "Arabic": ("ara",),
+    "Devanagari": ("hin",),
+    "Han": ("chi_sim", "chi_tra"),
+    "Japanese": ("jpn",),
+    "Korean": ("kor",),
+    "Hangul": ("kor",),
+    "Hebrew": ("heb",),
+    "Greek": ("ell",),
+    "Thai": ("tha",),
+}
+
+# The commonest short words of each language; a few hundred characters of
+# text are enough to tell languages that share a script apart
+STOPWORDS = {
+    "eng": {"the", "and", "of", "to", "in", "is", "that", "for", "it", "with", "as", "was", "on", "are", "this"},
+    "spa": {"el", "la", "de", "que", "y", "en", "los", "las", "del", "por", "una", "con", "para", "es", "se"},
+    "fra": {"le", "la", "les", "de", "des", "et", "est", "une", "un", "du", "que", "pour", "dans", "en", "pas"},
+    "deu": {"der", "die", "das", "und", "ist", "nicht", "ein", "eine", "zu", "den", "mit", "von", "sich", "auf", "im"},
+    "ita": {"il", "di", "che", "e", "la", "per", "un", "una", "del", "della", "non", "sono", "con", "gli", "le"},
+    "por": {"o", "de", "que", "e", "do", "da", "em", "um", "uma", "para", "com", "não", "os", "no", "na"},
+    "nld": {"de", "het", "een", "en", "van", "is", "dat", "op", "te", "zijn", "niet", "met", "voor", "ook", "aan"},
+    "tur": {"ve", "bir", "bu", "da", "de", "için", "ile", "çok", "ne", "gibi", "olarak", "daha", "ama", "mi", "var"},
+    "pol": {"i", "w", "na", "się", "nie", "z", "do", "jest", "to", "że", "o", "jak", "ale", "po", "co"},
+    "ces": {"a", "je", "se", "na", "v", "že", "to", "s", "z", "do", "jsou", "ale", "jak", "ve", "pro"},
+}
+
+# The first OCR pass reads a band across the middle of the page, scaled to at most this width
+SAMPLE_WIDTH = 1600
+
+
+def parse_languages(text):
+    # "eng+fra, deu" -> ["eng", "fra", "deu"], in the user's order
+    return [lang for lang in re.split(r"[+,;\s]+", text or "") if lang]
+
+
+def detect_script(image):
+    # Tesseract OSD on a small copy; needs osd.traineddata
+    import ocr_engine
+    from orientation import detection_copy
+
+    from PIL import ImageOps
+
+    # detection_copy is inverted for projection profiles; OSD wants dark text
+    output = ocr_engine.image_to_osd(ImageOps.invert(detection_copy(image)))
+    match = re.search(r"Script:\s*(\w+)", output)
+    return match.group(1) if match else None
+
+
+def sample_band(image, width=SAMPLE_WIDTH):
+    # Middle third of the page: usually body text, and a third of the OCR work
+    band = image.convert("L").crop((0, image.height // 3, image.width, image.height * 2 // 3))
+    if band.width > width:
+        band = band.resize((width, max(1, band.height * width // band.width)))
+    return band
+
+
+def stopword_scores(text, languages):
+    words = Counter(re.findall(r"\w+", text.lower()))
+    return {lang: sum(words[word] for word in STOPWORDS.get(lang, ())) for lang in languages}
+
+
+def detect_language(image, allowed, config=""):
+    # Picks one of the allowed languages for this page: OSD narrows them down
+    # by script, then a quick OCR pass over a band of the page decides between
+    # languages sharing a script. Returns (language, script or None).
+    if len(allowed) == 1:
+        return allowed[0], None
+
+    import ocr_engine
+
+    candidates = list(allowed)
+    try:
+        script = detect_script(image)
+    except Exception as e:
+        logger.debug("Script detection unavailable: %s", e)
+        script = None
+    if script in SCRIPT_LANGUAGES:
+        in_script = [lang for lang in candidates if lang in SCRIPT_LANGUAGES[script]]
+        if in_script:
+            candidates = in_script
+    if len(candidates) == 1:
+        return candidates[0], script
+
+    text = ocr_engine.image_to_string(sample_band(image), lang="+".join(candidates), config=config)
+    scores = stopword_scores(text, candidates)
+    # Ties (including no text at all) go to the earliest allowed language
+    return max(candidates, key=lambda lang: scores[lang]), script
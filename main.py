@@ -2,9 +2,10 @@ import os
 import threading
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-from PIL import Image, ImageTk
-import pytesseract
+from PIL import ImageTk
+import ocr_engine
 from docx import Document
+from image_store import get_store
 
 class ImgTextToWordGUI:
     def __init__(self, root):
@@ -114,8 +115,8 @@ class ImgTextToWordGUI:
 
     def load_preview_image(self, image_path):
         try:
-            # Open the image
-            img = Image.open(image_path)
+            # Decode through the shared image store (closes the file) and shrink a copy
+            img = get_store().get(image_path).copy()
             
             # Resize to fit canvas while maintaining aspect ratio
             canvas_width = self.canvas.winfo_width() or 700
@@ -175,11 +176,11 @@ class ImgTextToWordGUI:
             output_file = self.output_doc_path.get()
             lang = self.language.get()
             
-            # Open the image
-            image = Image.open(image_path)
+            # Usually already decoded for the preview
+            image = get_store().get(image_path)
             
             # Extract text using pytesseract OCR
-            text = pytesseract.image_to_string(image, lang=lang)
+            text = ocr_engine.image_to_string(image, lang=lang)
             
             # Create a new Word document
             doc = Document()
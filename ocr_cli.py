@@ -0,0 +1,369 @@
+import argparse
+import logging
+import os
+import sys
+import uuid
+from functools import partial
+
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import ocr_pipeline
+import profiling
+from cpu_budget import get_budget
+from file_enum import iter_image_files
+from image_store import get_store
+from job_spec import JobSpec
+from ocr_engine import TIMEOUT_ENV_VAR, page_timeout
+from ocr_supervisor import MEMORY_ENV_VAR, Quarantine, WorkerPool, memory_limit_mb
+from ocr_profiles import profile_names
+from orientation import METHODS
+from output_sink import SINK_KINDS, make_sink
+from prefetch import Prefetcher
+from regions import load_template
+from search_index import SearchIndex, default_index_path
+from work_queue import DEFAULT_LEASE_SECONDS, WorkQueue, run_worker
+
+
+def add_settings_arguments(parser):
+    parser.add_argument("--lang", default=ocr_pipeline.DEFAULT_SETTINGS["language"],
+                        help="Tesseract language, e.g. eng or eng+fra")
+    parser.add_argument("--detect-language", action="store_true",
+                        help="OCR each page in just one of the --lang languages, detected per page")
+    parser.add_argument("--profile", default=ocr_pipeline.DEFAULT_SETTINGS["ocr_profile"], choices=profile_names())
+    parser.add_argument("--models-dir", default="", help="directory containing tessdata_fast / tessdata_best")
+    parser.add_argument("--binarize", action="store_true", help="convert to black and white before OCR")
+    parser.add_argument("--threshold", type=int, default=ocr_pipeline.DEFAULT_SETTINGS["threshold"])
+    parser.add_argument("--auto-orient", action="store_true", help="detect and correct page rotation and skew")
+    parser.add_argument("--orient-method", default="auto", choices=METHODS,
+                        help="osd uses Tesseract (needs osd.traineddata), projection is pure Python")
+    parser.add_argument("--regions", type=region_template, default=(), metavar="TEMPLATE",
+                        help="region template saved from the GUI: OCR only those parts of every page")
+
+
+def region_template(path):
+    try:
+        return load_template(path)
+    except (OSError, ValueError, KeyError) as e:
+        raise argparse.ArgumentTypeError(f"cannot read region template {path}: {e}")
+
+
+def add_ingest_arguments(parser):
+    parser.add_argument("--include", action="append", default=[],
+                        help="only take files matching this glob (repeatable; name, or path relative to the folder)")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="skip files and folders matching this glob (repeatable)")
+
+
+def add_isolation_arguments(parser):
+    parser.add_argument("--page-timeout", type=float, default=page_timeout() or 0,
+                        help=f"seconds a page may take before its worker is killed, 0 for no limit "
+                             f"(default: %(default)s, or {TIMEOUT_ENV_VAR})")
+    parser.add_argument("--worker-memory-mb", type=int, default=memory_limit_mb(),
+                        help=f"memory limit per OCR worker process, 0 for no limit "
+                             f"(default: %(default)s, or {MEMORY_ENV_VAR})")
+    parser.add_argument("--in-process", action="store_true",
+                        help="OCR in threads of this process instead of supervised worker processes")
+    parser.add_argument("--retry-quarantined", action="store_true",
+                        help="also process inputs that previously timed out or crashed a worker")
+
+
+def make_pool(args, workers, quarantine):
+    if args.in_process:
+        # Tesseract itself is still stopped after the page timeout
+        os.environ[TIMEOUT_ENV_VAR] = str(args.page_timeout)
+        return None
+    return WorkerPool(workers, args.page_timeout, args.worker_memory_mb, quarantine)
+
+
+def settings_from_args(args):
+    return ocr_pipeline.merge_settings({
+        "language": args.lang,
+        "detect_language": args.detect_language,
+        "ocr_profile": args.profile,
+        "models_dir": args.models_dir,
+        "binarize": args.binarize,
+        "threshold": args.threshold,
+        "auto_orient": args.auto_orient,
+        "orient_method": args.orient_method,
+        "regions": args.regions,
+    })
+
+
+def save_atomic(doc, output_file):
+    # Write next to the destination and rename so readers never see partial files
+    tmp_file = f"{output_file}.{uuid.uuid4().hex[:8]}.tmp"
+    doc.save(tmp_file)
+    os.replace(tmp_file, output_file)
+
+
+def extract_text_with(pool, image_path, settings, details):
+    # In a supervised worker process if there is a pool, else in this thread
+    if pool is None:
+        return ocr_pipeline.extract_text_from_file(image_path, settings, details)
+    with profiling.stage("worker"):
+        return pool.extract_text_from_file(image_path, settings, details)
+
+
+def convert_to_file(image_path, output_file, settings, pool=None):
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    details = {}
+    text = extract_text_with(pool, image_path, settings, details)
+    with profiling.stage("document"):
+        doc = ocr_pipeline.create_word_document(text, settings)
+    with profiling.stage("write"):
+        save_atomic(doc, output_file)
+    ocr_pipeline.index_text(image_path, os.path.abspath(output_file), text, settings, details)
+    return details
+
+
+def convert_to_sink(image_path, output_name, settings, sink, job_id=None, pool=None):
+    details = {"job": job_id} if job_id else {}
+    text = extract_text_with(pool, image_path, settings, details)
+    with profiling.stage("document"):
+        doc = ocr_pipeline.create_word_document(text, settings)
+    # Indexed once the writer has saved it, so failed writes never show up in search results
+    def index(written_name):
+        ocr_pipeline.index_text(image_path, sink.output_location(written_name), text, settings, details)
+
+    # Includes serialising the document and any wait for a full writer queue
+    with profiling.stage("submit"):
+        sink.submit(doc, output_name, image_path, on_written=profiling.carry(index), **details)
+    return details
+
+
+def process_queue_item(item, pool=None, quarantine=None, retry_quarantined=False):
+    reason = quarantine.reason(item["path"]) if quarantine is not None else None
+    if reason and not retry_quarantined:
+        raise RuntimeError(f"quarantined: {reason}")
+    return convert_to_file(item["path"], item["output"], ocr_pipeline.merge_settings(item["settings"]), pool)
+
+
+def iter_inputs(inputs, include=(), exclude=()):
+    # Yields (image path, source root) pairs; directories are walked lazily
+    for path in inputs:
+        if os.path.isdir(path):
+            root = os.path.abspath(path)
+            for image_path in iter_image_files(root, include, exclude):
+                yield image_path, root
+        else:
+            yield os.path.abspath(path), None
+
+
+def cmd_enqueue(args):
+    queue = WorkQueue(args.queue_dir, args.lease)
+    spec = JobSpec.create("queue", settings_from_args(args), args.inputs, args.output_dir)
+    queue.record_job(spec.to_dict())
+    logging.info("Enqueuing %s", spec.describe())
+
+    settings = spec.settings
+    count = 0
+    for image_path, source_root in iter_inputs(spec.inputs, args.include, args.exclude):
+        output_file = ocr_pipeline.output_path_for(image_path, spec.output, source_root)
+        queue.enqueue(image_path, output_file, settings, spec.job_id)
+        count += 1
+    print(f"Enqueued {count} files as job {spec.job_id}")
+
+
+def cmd_batch(args):
+    spec = JobSpec.create("batch", settings_from_args(args), args.inputs, args.output_dir, args.sink)
+    logging.info("Starting %s", spec.describe())
+    settings = spec.settings
+    plan = get_budget().plan("batch")
+    success_count = 0
+    fail_count = 0
+    languages = Counter()
+
+    sink = make_sink(spec.output_kind, spec.output)
+    quarantine = Quarantine()
+    pool = make_pool(args, plan.workers, quarantine)
+    # Decoding ahead only helps when this process does the OCR
+    prefetcher = Prefetcher(decode=pool is None and ocr_pipeline.needs_preprocessing(settings))
+
+    # Conversion starts as soon as the first files are found; at most a few
+    # items per worker are in flight so huge trees don't pile up in memory.
+    # The ones waiting for a worker are prefetched meanwhile.
+    try:
+        with profiling.job(spec.output, "batch") as profiler:
+            with ThreadPoolExecutor(max_workers=plan.workers) as executor:
+                running = {}
+                inputs = iter_inputs(spec.inputs, args.include, args.exclude)
+                exhausted = False
+                while running or not exhausted:
+                    while not exhausted and len(running) < plan.workers * 2:
+                        try:
+                            image_path, source_root = next(inputs)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        reason = quarantine.reason(image_path)
+                        if reason and not args.retry_quarantined:
+                            fail_count += 1
+                            logging.warning("Skipping quarantined %s: %s", image_path, reason)
+                            continue
+                        output_name = ocr_pipeline.output_relpath_for(image_path, source_root)
+                        future = executor.submit(profiler.run, convert_to_sink, image_path, output_name, settings,
+                                                 sink, spec.job_id, pool)
+                        running[future] = image_path
+                        prefetcher.submit(image_path)
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        image_path = running.pop(future)
+                        try:
+                            details = future.result()
+                            success_count += 1
+                            languages[details.get("language", settings["language"])] += 1
+                            logging.info("Converted %s", image_path)
+                        except Exception as e:
+                            fail_count += 1
+                            logging.error("Failed to process %s: %s", image_path, e)
+
+            with profiling.stage("flush"):
+                write_errors = sink.close()
+    finally:
+        # If the batch is cut short, what was submitted is still written out
+        sink.close()
+        prefetcher.close()
+        if pool is not None:
+            pool.close()
+
+    for source_path, msg in write_errors:
+        if source_path:
+            success_count -= 1
+        fail_count += 1
+        logging.error("Failed to write %s: %s", source_path or sink.location, msg)
+
+    if pool is None:
+        logging.info(get_store().describe())
+    elif pool.restarts:
+        logging.warning("%d OCR worker(s) were restarted; see 'ocr_cli.py quarantine'", pool.restarts)
+    print(f"Output written to {sink.location}")
+    print(f"Batch processing complete. Success: {success_count}, Failed: {fail_count}")
+    if settings["detect_language"]:
+        print("Languages: " + ", ".join(f"{lang} {count}" for lang, count in languages.most_common()))
+    return 1 if fail_count else 0
+
+
+def cmd_worker(args):
+    queue = WorkQueue(args.queue_dir, args.lease)
+    quarantine = Quarantine()
+    # One page at a time, like the worker loop itself
+    pool = make_pool(args, 1, quarantine)
+    process_item = partial(process_queue_item, pool=pool, quarantine=quarantine,
+                           retry_quarantined=args.retry_quarantined)
+    try:
+        # Outputs can go anywhere, so a worker's profile is kept with the queue
+        with profiling.job(os.path.join(args.queue_dir, "profiles"), f"worker-{os.getpid()}") as profiler:
+            processed = profiler.run(run_worker, queue, process_item, poll_interval=args.poll, once=args.once)
+    finally:
+        if pool is not None:
+            pool.close()
+    print(f"Worker processed {processed} items")
+
+
+def cmd_status(args):
+    queue = WorkQueue(args.queue_dir, args.lease)
+    queue.reclaim_expired()
+    for state, count in queue.status().items():
+        print(f"{state:<8} {count}")
+
+
+def cmd_quarantine(args):
+    quarantine = Quarantine()
+    if args.clear:
+        quarantine.clear()
+        print("Quarantine cleared")
+        return
+    for path in args.remove:
+        quarantine.remove(path)
+    entries = quarantine.entries()
+    for path, entry in sorted(entries.items()):
+        print(f"{path}: {entry['reason']}")
+    print(f"{len(entries)} quarantined inputs ({quarantine.path})")
+
+
+def cmd_search(args):
+    index = SearchIndex(args.index)
+    try:
+        results = index.search(args.query, limit=args.limit, language=args.language, order=args.order)
+    except ValueError as e:
+        logging.error("%s", e)
+        return 2
+    for result in results:
+        print(f"{result.source} (page {result.page}, {result.language or '?'}) -> {result.output}")
+        print(f"    {' '.join(result.snippet.split())}")
+    print(f"{len(results)} of {index.count()} indexed pages matched")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="OCR images to Word documents from the command line")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("--profiling", action="store_true",
+                        help="write cProfile and memory reports next to the output (same as OCR_PROFILE=1)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = subparsers.add_parser("enqueue", help="add images to a shared work queue")
+    enqueue.add_argument("queue_dir")
+    enqueue.add_argument("inputs", nargs="+", help="image files or folders")
+    enqueue.add_argument("--output-dir", required=True)
+    add_settings_arguments(enqueue)
+    add_ingest_arguments(enqueue)
+    enqueue.set_defaults(func=cmd_enqueue)
+
+    batch = subparsers.add_parser("batch", help="convert image files or folders on this machine")
+    batch.add_argument("inputs", nargs="+", help="image files or folders")
+    batch.add_argument("--output-dir", required=True)
+    add_settings_arguments(batch)
+    add_ingest_arguments(batch)
+    batch.add_argument("--sink", default="directory", choices=SINK_KINDS,
+                       help="write one file per document, or append them all to a single zip/tar archive")
+    batch.set_defaults(func=cmd_batch)
+
+    worker = subparsers.add_parser("worker", help="process items from a shared work queue")
+    worker.add_argument("queue_dir")
+    worker.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    worker.add_argument("--poll", type=float, default=2.0, help="seconds between polls of an empty queue")
+    worker.set_defaults(func=cmd_worker)
+
+    status = subparsers.add_parser("status", help="show queue counts and reclaim expired leases")
+    status.add_argument("queue_dir")
+    status.set_defaults(func=cmd_status)
+
+    search = subparsers.add_parser("search", help="search the text of everything converted so far")
+    search.add_argument("query", help='FTS5 query: words, "a phrase", prefix*, AND/OR/NOT')
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--language", help="only pages OCR'd in this language")
+    search.add_argument("--order", default="rank", choices=("rank", "recent"),
+                        help="best matches first, or newest first (much faster for very common words)")
+    search.add_argument("--index", default=default_index_path(), help="index file (default: %(default)s)")
+    search.set_defaults(func=cmd_search)
+
+    quarantine = subparsers.add_parser("quarantine", help="list inputs that timed out or crashed an OCR worker")
+    quarantine.add_argument("--remove", action="append", default=[], metavar="PATH",
+                            help="take an input off the list (repeatable)")
+    quarantine.add_argument("--clear", action="store_true", help="empty the list")
+    quarantine.set_defaults(func=cmd_quarantine)
+
+    for subparser in (batch, worker):
+        add_isolation_arguments(subparser)
+
+    for subparser in (enqueue, worker, status):
+        subparser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                               help="seconds before an unrenewed lease is reclaimed")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.profiling:
+        profiling.set_enabled(True)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
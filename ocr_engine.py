@@ -0,0 +1,131 @@
+import logging
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+
+import profiling
+from cpu_budget import get_budget
+
+logger = logging.getLogger(__name__)
+
+# Formats Tesseract (Leptonica) decodes itself, so files on disk can be passed as-is
+TESSERACT_FORMATS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.gif', '.webp',
+                     '.pnm', '.pbm', '.pgm', '.ppm')
+
+# Longest a single Tesseract run may take, in seconds (0 for no limit)
+TIMEOUT_ENV_VAR = "OCR_PAGE_TIMEOUT"
+DEFAULT_TIMEOUT = 300
+
+# PNM flavours by PIL mode: bilevel, grayscale, colour. They are written without
+# any compression, which is far cheaper than the PNG pytesseract would encode.
+PNM_EXTENSIONS = {'1': '.pbm', 'L': '.pgm', 'RGB': '.ppm'}
+
+
+# Parsed environment values by (name, raw value), so a bad one is reported once
+_env_numbers = {}
+
+
+class OCRTimeout(RuntimeError):
+    pass
+
+
+def number_from_env(name, default, convert=float):
+    # A finite, non-negative number from the environment; anything else falls back to the default
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        return _env_numbers[name, raw]
+    except KeyError:
+        pass
+    try:
+        value = convert(raw)
+        if not 0 <= value < float("inf"):
+            raise ValueError(raw)
+    except ValueError:
+        logger.warning("Ignoring %s=%r: expected a finite number of 0 or more; using %s", name, raw, default)
+        value = default
+    _env_numbers[name, raw] = value
+    return value
+
+
+def page_timeout():
+    # None when disabled
+    return number_from_env(TIMEOUT_ENV_VAR, DEFAULT_TIMEOUT) or None
+
+
+def handoff_dir():
+    # Prefer a RAM-backed filesystem so the handoff never touches the disk
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+def can_pass_through(path):
+    return isinstance(path, str) and path.lower().endswith(TESSERACT_FORMATS) and os.path.isfile(path)
+
+
+@contextmanager
+def handoff_file(image):
+    # Write the image as uncompressed PNM for Tesseract and remove it afterwards
+    if image.mode not in PNM_EXTENSIONS:
+        image = image.convert('RGB')
+    path = os.path.join(handoff_dir(), f"ocr_{uuid.uuid4().hex}{PNM_EXTENSIONS[image.mode]}")
+    try:
+        image.save(path, format='PPM')
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _pytesseract():
+    # Imported on first use to keep application startup fast
+    import pytesseract
+
+    if os.environ.get("TESSERACT_CMD"):
+        pytesseract.pytesseract.tesseract_cmd = os.environ["TESSERACT_CMD"]
+    return pytesseract
+
+
+def _run_tesseract(name, func, *args, **kwargs):
+    # pytesseract kills Tesseract when the timeout expires
+    timeout = page_timeout()
+    try:
+        if not profiling.enabled():
+            return func(*args, timeout=timeout or 0, **kwargs)
+        # Wall time of the Tesseract process, for profiling runs only
+        start = time.perf_counter()
+        try:
+            return func(*args, timeout=timeout or 0, **kwargs)
+        finally:
+            profiling.record_subprocess(name, time.perf_counter() - start)
+    except RuntimeError as e:
+        if str(e) != "Tesseract process timeout":
+            raise
+        raise OCRTimeout(f"Tesseract timed out after {timeout:.0f}s") from e
+
+
+def image_to_osd(image):
+    # Orientation and script detection; used on small copies only
+    pytesseract = _pytesseract()
+    with get_budget().slot():
+        with handoff_file(image) as path:
+            return _run_tesseract("tesseract osd", pytesseract.image_to_osd, path, config="--psm 0")
+
+
+def image_to_string(image, lang, config=""):
+    pytesseract = _pytesseract()
+
+    # Every OCR call goes through here so concurrent callers share one CPU budget
+    with get_budget().slot():
+        # An unmodified file is read by Tesseract directly, with no re-encode at all
+        if can_pass_through(image):
+            return _run_tesseract("tesseract", pytesseract.image_to_string, image, lang=lang, config=config)
+
+        with handoff_file(image) as path:
+            return _run_tesseract("tesseract", pytesseract.image_to_string, path, lang=lang, config=config)
@@ -0,0 +1,329 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import ocr_engine
+import profiling
+from cpu_budget import get_budget
+from image_store import get_store
+from language_detect import SAMPLE_WIDTH, detect_language, parse_languages
+from orientation import apply_orientation, auto_orient, detect_orientation
+from ocr_profiles import DEFAULT_PROFILE, build_tesseract_config, describe_profile, models_in_use
+from regions import box_pixels, normalize_regions
+from search_index import index_conversion
+
+# Settings used when nothing else is specified (same defaults as the GUI)
+DEFAULT_SETTINGS = {
+    "language": "eng",
+    # Pick one of allowed_languages per page (the parts of "language" if empty)
+    "detect_language": False,
+    "allowed_languages": "",
+    "ocr_profile": DEFAULT_PROFILE,
+    "models_dir": "",
+    "sparse_text": False,
+    "brightness": 1.0,
+    "contrast": 1.0,
+    "sharpen": 1.0,
+    "binarize": False,
+    "threshold": 127,
+    "auto_orient": False,
+    "orient_method": "auto",
+    # OCR only these (label, fractional box) regions of each page, see regions.py
+    "regions": (),
+    "font_family": "Calibri",
+    "font_size": 11,
+    "alignment": "Left",
+    "include_title": True,
+    "title_text": "OCR Extracted Text",
+}
+
+logger = logging.getLogger(__name__)
+
+# Settings that only change how the document looks, not the OCR text
+FORMAT_SETTINGS = ("font_family", "font_size", "alignment", "include_title", "title_text")
+
+# The settings process_image_with_settings depends on
+PREPROCESS_SETTINGS = ("brightness", "contrast", "sharpen", "binarize", "threshold")
+
+# PIL and python-docx (lxml) are imported inside the functions that need them so
+# that importing this module, and starting the GUI, stays cheap
+
+
+def merge_settings(settings=None):
+    merged = dict(DEFAULT_SETTINGS)
+    if settings:
+        merged.update(settings)
+    merged["regions"] = normalize_regions(merged["regions"])
+    return merged
+
+
+def process_image_with_settings(image, settings):
+    from PIL import ImageEnhance
+
+    img = image.copy()
+
+    # Apply brightness adjustment
+    if settings["brightness"] != 1.0:
+        enhancer = ImageEnhance.Brightness(img)
+        img = enhancer.enhance(settings["brightness"])
+
+    # Apply contrast adjustment
+    if settings["contrast"] != 1.0:
+        enhancer = ImageEnhance.Contrast(img)
+        img = enhancer.enhance(settings["contrast"])
+
+    # Apply sharpness adjustment
+    if settings["sharpen"] != 1.0:
+        enhancer = ImageEnhance.Sharpness(img)
+        img = enhancer.enhance(settings["sharpen"])
+
+    # Apply binarization (convert to black and white)
+    if settings["binarize"]:
+        threshold = settings["threshold"]
+        # Convert to grayscale first
+        img = img.convert('L')
+        # Apply threshold
+        img = img.point(lambda x: 0 if x < threshold else 255, '1')
+
+    return img
+
+
+def processed_image_for(image, settings, source=None, base_key=None):
+    # With source, image is the file at source (or its base_key variant) and the
+    # result is kept in the image store for the next run with the same settings
+    if source is None:
+        return process_image_with_settings(image, settings)
+    key = ("processed", base_key) + tuple(settings[name] for name in PREPROCESS_SETTINGS)
+    return get_store().variant(source, key, lambda: process_image_with_settings(image, settings))
+
+
+def tesseract_config(settings):
+    return build_tesseract_config(settings["ocr_profile"], settings["models_dir"], settings["sparse_text"])
+
+
+def needs_preprocessing(settings):
+    return (settings["brightness"] != 1.0 or settings["contrast"] != 1.0 or settings["sharpen"] != 1.0
+            or settings["binarize"] or settings["auto_orient"] or bool(settings["regions"]))
+
+
+def ocr_language(image, settings, details=None):
+    # The language to OCR this page with: the configured one, or detected per page
+    if not settings["detect_language"]:
+        return settings["language"]
+
+    allowed = parse_languages(settings["allowed_languages"] or settings["language"])
+    with profiling.stage("language"):
+        language, script = detect_language(image, allowed,
+                                           build_tesseract_config("fast", settings["models_dir"]))
+    logger.info("Language: %s (script %s)", language, script or "unknown")
+    if details is not None:
+        details["language"] = language
+        if script:
+            details["script"] = script
+    return language
+
+
+def region_crops(image, regions, orientation=None):
+    # (label, crop) pairs; with an orientation each crop is turned upright the
+    # same way the whole page would be
+    crops = []
+    for label, box in regions:
+        crop = image.crop(box_pixels(box, image.size))
+        if orientation:
+            crop = apply_orientation(crop, orientation)
+        crops.append((label, crop))
+    return crops
+
+
+def format_regions(results):
+    # One paragraph per region, headed by its label
+    return "\n\n".join(f"{label}:\n{text}" for label, text in results)
+
+
+def extract_regions(image, settings, details=None):
+    # OCR of the template regions only, in parallel. Regions are boxes in the
+    # file's own orientation, so the page is cropped first and only the crops
+    # are rotated.
+    orientation = None
+    if settings["auto_orient"]:
+        with profiling.stage("orient"):
+            orientation = detect_orientation(image, settings["orient_method"])
+        if details is not None:
+            details["orientation"] = orientation
+
+    with profiling.stage("crop"):
+        crops = region_crops(image, settings["regions"], orientation)
+    # Detected on the largest region rather than on the whole page
+    largest = max((crop for _, crop in crops), key=lambda crop: crop.width * crop.height)
+    language = ocr_language(largest, settings, details)
+    config = tesseract_config(settings)
+
+    def read(crop):
+        processed = process_image_with_settings(crop, settings)
+        return ocr_engine.image_to_string(processed, lang=language, config=config).strip()
+
+    # Each call still waits for a CPU budget slot, so batches running region
+    # jobs side by side don't oversubscribe the machine
+    with profiling.stage("ocr"):
+        with ThreadPoolExecutor(max_workers=min(len(crops), get_budget().slots)) as executor:
+            texts = list(executor.map(profiling.carry(read), [crop for _, crop in crops]))
+
+    results = [(label, text) for (label, _), text in zip(crops, texts)]
+    if details is not None:
+        details["regions"] = dict(results)
+    return format_regions(results)
+
+
+def extract_text(image, settings, details=None, source=None):
+    # details, if given, collects per-file facts such as the detected orientation.
+    # source is the path image was decoded from, if it is unmodified; the
+    # oriented and processed variants are then cached in the image store.
+    if settings["regions"]:
+        return extract_regions(image, settings, details)
+
+    orient_key = None
+    if settings["auto_orient"]:
+        orient_key = ("orient", settings["orient_method"])
+        with profiling.stage("orient"):
+            if source is None:
+                image, orientation = auto_orient(image, settings["orient_method"])
+            else:
+                image, orientation = get_store().variant(source, orient_key,
+                                                         lambda: auto_orient(image, settings["orient_method"]))
+        logger.info("Orientation: rotate %d, skew %.2f (%s)", orientation["rotation"], orientation["skew"],
+                    orientation["method"])
+        if details is not None:
+            details["orientation"] = orientation
+
+    language = ocr_language(image, settings, details)
+
+    with profiling.stage("preprocess"):
+        processed_image = processed_image_for(image, settings, source, orient_key)
+    with profiling.stage("ocr"):
+        return ocr_engine.image_to_string(processed_image, lang=language, config=tesseract_config(settings))
+
+
+def extract_text_from_file(image_path, settings, details=None):
+    # Without preprocessing Tesseract can read the original file itself, so the
+    # image is never decoded here nor re-encoded for the handoff
+    from PIL import Image
+
+    if details is not None:
+        # For the manifest and queue results: the profile and the models it really ran with
+        details["ocr_profile"] = settings["ocr_profile"]
+        details["models"] = models_in_use(settings["ocr_profile"], settings["models_dir"])
+
+    if not needs_preprocessing(settings) and ocr_engine.can_pass_through(image_path):
+        language = settings["language"]
+        if settings["detect_language"]:
+            # Detection only needs a reduced copy; Tesseract still reads the original file
+            with Image.open(image_path) as image:
+                image.draft("L", (SAMPLE_WIDTH, SAMPLE_WIDTH))
+                language = ocr_language(image, settings, details)
+        with profiling.stage("ocr"):
+            return ocr_engine.image_to_string(image_path, lang=language, config=tesseract_config(settings))
+
+    # Decoded once into the shared image store; the file is closed straight away
+    with profiling.stage("decode"):
+        image = get_store().get(image_path)
+    return extract_text(image, settings, details, source=image_path)
+
+
+def read_page(image_path, settings):
+    # extract_text_from_file as a picklable call for worker processes: (text, details)
+    details = {}
+    return extract_text_from_file(image_path, settings, details), details
+
+
+def create_word_document(text, settings):
+    from docx import Document
+    from docx.shared import Pt
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+
+    align_map = {
+        "Left": WD_PARAGRAPH_ALIGNMENT.LEFT,
+        "Center": WD_PARAGRAPH_ALIGNMENT.CENTER,
+        "Right": WD_PARAGRAPH_ALIGNMENT.RIGHT,
+        "Justify": WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+    }
+
+    # Create a new Word document
+    doc = Document()
+
+    # Record how the text was produced
+    doc.core_properties.comments = f"OCR profile: {describe_profile(settings['ocr_profile'], settings['models_dir'])}"
+
+    # Apply document title if enabled
+    if settings["include_title"]:
+        doc.add_heading(settings["title_text"], 0)
+
+    # Get paragraph alignment
+    alignment = align_map.get(settings["alignment"], WD_PARAGRAPH_ALIGNMENT.LEFT)
+
+    # Process the text content
+    paragraphs = text.split('\n\n')
+    for para in paragraphs:
+        if para.strip():
+            p = doc.add_paragraph(para.strip())
+
+            # Apply paragraph formatting
+            p.alignment = alignment
+
+            # Apply character formatting to runs
+            for run in p.runs:
+                run.font.name = settings["font_family"]
+                run.font.size = Pt(settings["font_size"])
+
+    return doc
+
+
+def output_name_for(image_path):
+    base_name = os.path.splitext(os.path.basename(image_path))[0]
+    return f"{base_name}.docx"
+
+
+def output_relpath_for(image_path, source_root=None):
+    # Files ingested from a folder keep their sub-directory under the output
+    # directory, so scans/a/001.png and scans/b/001.png don't overwrite each other
+    if source_root:
+        rel_dir = os.path.relpath(os.path.dirname(image_path), source_root)
+        if rel_dir != os.curdir and not rel_dir.startswith(os.pardir):
+            return os.path.join(rel_dir, output_name_for(image_path))
+    return output_name_for(image_path)
+
+
+def output_path_for(image_path, output_dir, source_root=None):
+    return os.path.join(output_dir, output_relpath_for(image_path, source_root))
+
+
+def index_text(source, output, text, settings, details=None):
+    # Record the text in the local search index, under the language it was read in
+    language = details.get("language", settings["language"]) if details else settings["language"]
+    with profiling.stage("index"):
+        index_conversion(source, output, text, language)
+
+
+def convert_file(image_path, output_file, settings, details=None, text=None):
+    # Full pipeline for one input: load, preprocess, OCR, build and save the
+    # document. text skips the OCR when it is already known for these settings.
+    if text is None:
+        text = extract_text_from_file(image_path, settings, details)
+    with profiling.stage("document"):
+        doc = create_word_document(text, settings)
+    with profiling.stage("write"):
+        os.makedirs(os.path.dirname(output_file) or os.curdir, exist_ok=True)
+        doc.save(output_file)
+    index_text(image_path, os.path.abspath(output_file), text, settings, details)
+    return text
+
+
+# Modules the first conversion needs, in import order
+WARM_UP_MODULES = ("PIL.Image", "PIL.ImageEnhance", "PIL.ImageTk", "pytesseract", "docx")
+
+
+def warm_up():
+    # Import the heavy modules ahead of the first conversion (called from a background thread)
+    import importlib
+
+    for name in WARM_UP_MODULES:
+        importlib.import_module(name)
@@ -0,0 +1,78 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# OCR speed/accuracy profiles.
+#   oem 1  = LSTM engine only
+#   psm 3  = fully automatic page segmentation
+#   psm 6  = assume a single uniform block of text
+#   models = which tessdata model set to load ("fast"/"best" are looked up
+#            under the configured models directory, None = system default)
+PROFILES = {
+    "fast": {"oem": 1, "psm": 6, "models": "fast"},
+    "balanced": {"oem": 1, "psm": 3, "models": None},
+    "best": {"oem": 1, "psm": 3, "models": "best"},
+}
+
+DEFAULT_PROFILE = "balanced"
+
+# Sparse text mode for the fast profile (find as much text as possible in no particular order)
+SPARSE_PSM = 11
+
+# (models_dir, models) pairs already warned about, so a batch logs the fallback once
+_missing_reported = set()
+
+
+def profile_names():
+    return list(PROFILES.keys())
+
+
+def find_tessdata_dir(models_dir, models):
+    # The models directory may either be a tessdata directory itself or contain
+    # tessdata_fast/ and tessdata_best/ checkouts side by side
+    if not models_dir or not models:
+        return None
+
+    candidate = os.path.join(models_dir, f"tessdata_{models}")
+    if os.path.isdir(candidate):
+        return candidate
+    if os.path.isdir(models_dir) and os.path.basename(os.path.normpath(models_dir)) == f"tessdata_{models}":
+        return models_dir
+
+    if (models_dir, models) not in _missing_reported:
+        _missing_reported.add((models_dir, models))
+        logger.warning("tessdata_%s not found in %s, using the system models instead", models, models_dir)
+    return None
+
+
+def models_in_use(profile, models_dir=""):
+    # The model set OCR actually runs with: "fast"/"best", or "system" (with
+    # the reason when the profile asked for another set that wasn't found)
+    models = PROFILES.get(profile, PROFILES[DEFAULT_PROFILE])["models"]
+    if not models:
+        return "system"
+    if find_tessdata_dir(models_dir, models):
+        return models
+    return f"system (tessdata_{models} not found)"
+
+
+def build_tesseract_config(profile, models_dir="", sparse=False):
+    settings = PROFILES.get(profile, PROFILES[DEFAULT_PROFILE])
+
+    psm = settings["psm"]
+    if sparse and profile == "fast":
+        psm = SPARSE_PSM
+
+    config = f"--oem {settings['oem']} --psm {psm}"
+
+    tessdata_dir = find_tessdata_dir(models_dir, settings["models"])
+    if tessdata_dir:
+        # Tesseract wants the path quoted when it contains spaces
+        config += f' --tessdata-dir "{tessdata_dir}"'
+
+    return config
+
+
+def describe_profile(profile, models_dir=""):
+    return f"{profile}, {models_in_use(profile, models_dir)} models ({build_tesseract_config(profile, models_dir)})"
@@ -0,0 +1,324 @@
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+import image_store
+import profiling
+from cpu_budget import CpuBudget, get_budget, set_budget
+from env_probe import cache_dir
+from ocr_engine import OCRTimeout, number_from_env, page_timeout
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: saves still merge with the file, but without a lock between processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Address space limit for each OCR worker process and the Tesseract processes
+# it starts, in MB (0 for no limit)
+MEMORY_ENV_VAR = "OCR_WORKER_MEMORY_MB"
+DEFAULT_MEMORY_MB = 4096
+
+# Workers are replaced after this many pages, returning any fragmented memory
+MAX_TASKS_PER_WORKER = 500
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+def memory_limit_mb():
+    return number_from_env(MEMORY_ENV_VAR, DEFAULT_MEMORY_MB, int)
+
+
+def limit_memory(memory_mb):
+    # RLIMIT_AS is inherited by child processes, so it covers Tesseract too
+    if not memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        logger.debug("No resource limits on this platform")
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _worker_main(conn, memory_mb, nice=0):
+    # Own process group, so a kill takes any running Tesseract with it
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    # Niceness is inherited by Tesseract as well
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+    # Each page is decoded once here; caching it would only count against the limit
+    os.environ[image_store.ENV_VAR] = "0"
+    # The parent holds one slot of its CPU budget for every task it sends, so
+    # one Tesseract at a time here (region crops included)
+    set_budget(CpuBudget(slots=1))
+    limit_memory(memory_mb)
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        func, args = task
+        try:
+            reply = ("ok", func(*args))
+        except MemoryError:
+            reply = ("memory", f"Out of memory (limit {memory_mb} MB)")
+        except OCRTimeout as e:
+            reply = ("timeout", str(e))
+        except Exception as e:
+            # pytesseract reports a Tesseract killed by a signal (e.g. abort on a
+            # failed allocation) with a negative status
+            status = getattr(e, "status", 0)
+            reply = ("crash" if isinstance(status, int) and status < 0 else "error", str(e) or type(e).__name__)
+        conn.send(reply)
+
+
+class IsolatedWorker:
+    # One worker process, fed one task at a time over a pipe
+
+    def __init__(self, context, memory_mb, nice=0):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_mb, nice), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def call(self, func, args, timeout):
+        self.tasks += 1
+        try:
+            self.conn.send((func, args))
+            if not self.conn.poll(timeout):
+                self.kill()
+                raise OCRTimeout(f"Timed out after {timeout:.0f}s")
+            return self.conn.recv()
+        except (EOFError, ConnectionError):
+            self.kill()
+            raise WorkerCrashed(f"OCR worker died (exit code {self.process.exitcode})")
+
+    def signal_kill(self):
+        # Safe from any thread; a caller waiting in call() then sees the worker die
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+
+    def kill(self):
+        self.signal_kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(2)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class WorkerPool:
+    # Runs OCR in separate worker processes under a watchdog: a page that runs
+    # past the timeout has its worker (and Tesseract) killed, a worker that
+    # dies or runs out of memory is replaced, and the input is quarantined.
+    # Thread-safe; callers block in run() while a worker handles their page.
+
+    def __init__(self, workers, timeout=None, memory_mb=None, quarantine=None, nice=0):
+        self.timeout = page_timeout() if timeout is None else timeout or None
+        self.memory_mb = memory_limit_mb() if memory_mb is None else memory_mb
+        self.quarantine = quarantine
+        self.nice = nice
+        # spawn: forking a process with Tk and worker threads running is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(workers)
+        self._idle = []
+        self._busy = set()
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return IsolatedWorker(self._context, self.memory_mb, self.nice)
+
+    def _checkin(self, worker):
+        if worker.tasks >= MAX_TASKS_PER_WORKER:
+            worker.stop()
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def _failed(self, path, reason):
+        with self._lock:
+            self.restarts += 1
+        if path and self.quarantine is not None:
+            self.quarantine.add(path, reason)
+            logger.warning("Quarantined %s: %s", path, reason)
+
+    def run(self, func, *args, path=None):
+        # func and args must be picklable; path is the input to quarantine if the page kills its worker.
+        # Each task takes a slot of this process's CPU budget, shared with in-process OCR and other pools.
+        with self._slots, get_budget().slot():
+            worker = self._checkout()
+            with self._lock:
+                self._busy.add(worker)
+            try:
+                status, value = worker.call(func, args, self.timeout)
+            except (OCRTimeout, WorkerCrashed) as e:
+                self._failed(path, str(e))
+                raise
+            except BaseException:
+                # The worker may be half way through a task; don't reuse it
+                worker.kill()
+                raise
+            finally:
+                with self._lock:
+                    self._busy.discard(worker)
+            self._checkin(worker)
+
+        if status == "ok":
+            if path and self.quarantine is not None:
+                self.quarantine.remove(path)
+            return value
+        if status == "error":
+            raise RuntimeError(value)
+        # The worker survived, but the input is still one that blows the limits
+        self._failed(path, value)
+        raise (OCRTimeout if status == "timeout" else MemoryError if status == "memory" else WorkerCrashed)(value)
+
+    def extract_text_from_file(self, image_path, settings, details=None):
+        # Drop-in for ocr_pipeline.extract_text_from_file
+        import ocr_pipeline
+
+        if profiling.active() is None:
+            text, page_details = self.run(ocr_pipeline.read_page, image_path, settings, path=image_path)
+        else:
+            # The worker times its own stages and Tesseract runs for the job's report
+            (text, page_details), timings = self.run(profiling.capture, ocr_pipeline.read_page, image_path,
+                                                     settings, path=image_path)
+            profiling.merge(timings)
+        if details is not None:
+            details.update(page_details)
+        return text
+
+    def cancel(self):
+        # Kill the workers that are busy right now; their run() calls raise WorkerCrashed
+        with self._lock:
+            workers = list(self._busy)
+        for worker in workers:
+            worker.signal_kill()
+
+    def close(self):
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+
+
+def default_quarantine_path():
+    return os.path.join(cache_dir(), "quarantine.json")
+
+
+class Quarantine:
+    # Inputs that timed out, ran out of memory or crashed a worker. Batches
+    # skip them until the file changes on disk (or they are retried). Several
+    # processes may share the file (the GUI, batches, queue workers): every
+    # change is merged into what is on disk, under a lock file.
+
+    def __init__(self, path=None):
+        self.path = path or default_quarantine_path()
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def _updating(self):
+        # Re-reads the file, lets the caller change self._entries and writes it back
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(f"{self.path}.lock", "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._entries = self._load()
+                yield self._entries
+                self._save()
+
+    def add(self, path, reason):
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        with self._updating() as entries:
+            entries[path] = {"reason": reason, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                             "quarantined_at": time.time()}
+
+    def reason(self, path):
+        # Why path is quarantined, or None if it isn't (or has changed since)
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) != (entry["mtime_ns"], entry["size"]):
+            return None
+        return entry["reason"]
+
+    def remove(self, path):
+        # Called for every page that converts fine, so only touches the file for quarantined ones
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._entries:
+                return
+        with self._updating() as entries:
+            entries.pop(path, None)
+
+    def clear(self):
+        with self._updating() as entries:
+            entries.clear()
+
+    def entries(self):
+        with self._lock:
+            return dict(self._entries)
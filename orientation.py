@@ -0,0 +1,139 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Detection runs on a copy no larger than this (longest side, pixels)
+DETECT_SIZE = 800
+
+# Fine deskew search range and steps, in degrees
+MAX_SKEW = 5.0
+COARSE_STEP = 1.0
+FINE_STEP = 0.2
+
+METHODS = ("auto", "projection", "osd")
+
+
+def detection_copy(image, size=DETECT_SIZE):
+    # Small inverted grayscale copy: text is bright, background dark, so
+    # projection profiles measure ink and rotation padding adds nothing
+    from PIL import ImageOps
+
+    small = image.convert("L")
+    small.thumbnail((size, size))
+    return ImageOps.invert(small)
+
+
+def row_profile_variance(image):
+    # Squash every row to one pixel to get the ink per row. Text lines aligned
+    # with the rows give a strongly alternating profile. Row sums rather than
+    # means, so padding added by rotation doesn't dilute the score.
+    from PIL import Image
+
+    width = image.width
+    profile = [value * width for value in image.resize((1, image.height), Image.BOX).getdata()]
+    mean = sum(profile) / len(profile)
+    return sum((value - mean) ** 2 for value in profile) / len(profile)
+
+
+def rotated_variance(image, angle):
+    from PIL import Image
+
+    if angle == 0:
+        return row_profile_variance(image)
+    return row_profile_variance(image.rotate(angle, resample=Image.BILINEAR, expand=True))
+
+
+def find_skew(image):
+    # Coarse then fine search for the counter-clockwise angle that best aligns
+    # text lines; returns the angle and its score
+    best_angle = 0.0
+    best_score = rotated_variance(image, 0)
+
+    steps = int(MAX_SKEW / COARSE_STEP)
+    for i in range(-steps, steps + 1):
+        angle = i * COARSE_STEP
+        score = rotated_variance(image, angle)
+        if score > best_score:
+            best_angle, best_score = angle, score
+
+    center = best_angle
+    steps = int(COARSE_STEP / FINE_STEP)
+    for i in range(-steps, steps + 1):
+        angle = center + i * FINE_STEP
+        score = rotated_variance(image, angle)
+        if score > best_score:
+            best_angle, best_score = angle, score
+
+    return best_angle, best_score
+
+
+def projection_orientation(image):
+    # Text lines run along the rows (0/180) or the columns (90/270); whichever
+    # deskews best wins. Projection profiles can't tell upside-down text apart,
+    # which is what OSD is for.
+    from PIL import Image
+
+    upright_angle, upright_score = find_skew(image)
+    sideways_angle, sideways_score = find_skew(image.transpose(Image.ROTATE_90))
+    if sideways_score > upright_score:
+        return 90, -sideways_angle
+    return 0, -upright_angle
+
+
+def osd_rotation(image):
+    # One Tesseract OSD call on the small copy; needs osd.traineddata
+    import ocr_engine
+
+    from PIL import ImageOps
+
+    output = ocr_engine.image_to_osd(ImageOps.invert(image))
+    match = re.search(r"Rotate:\s*(\d+)", output)
+    return int(match.group(1)) % 360 if match else 0
+
+
+def detect_orientation(image, method="auto"):
+    # Returns the clockwise rotation (0/90/180/270) and the additional clockwise
+    # skew, in degrees, that make the page upright
+    small = detection_copy(image)
+
+    if method in ("auto", "osd"):
+        try:
+            rotation = osd_rotation(small)
+        except Exception as e:
+            if method == "osd":
+                raise
+            logger.debug("OSD unavailable, using projection profiles: %s", e)
+        else:
+            from PIL import Image
+
+            # Measure the remaining skew on the upright copy
+            if rotation:
+                small = small.rotate(-rotation, resample=Image.NEAREST, expand=True)
+            angle, _ = find_skew(small)
+            return {"rotation": rotation, "skew": round(-angle, 2) or 0.0, "method": "osd"}
+
+    rotation, skew = projection_orientation(small)
+    return {"rotation": rotation, "skew": round(skew, 2) or 0.0, "method": "projection"}
+
+
+def apply_orientation(image, orientation):
+    # Single resampling pass at full resolution
+    from PIL import Image
+
+    angle = orientation["rotation"] + orientation["skew"]
+    if not angle % 360:
+        return image
+    if not orientation["skew"]:
+        transpose = {90: Image.ROTATE_270, 180: Image.ROTATE_180, 270: Image.ROTATE_90}
+        return image.transpose(transpose[orientation["rotation"]])
+
+    if image.mode not in ("1", "L", "RGB"):
+        image = image.convert("RGB")
+    fill = 255 if image.mode in ("1", "L") else (255, 255, 255)
+    return image.rotate(-angle, resample=Image.BICUBIC, expand=True, fillcolor=fill)
+
+
+def auto_orient(image, method="auto"):
+    orientation = detect_orientation(image, method)
+    return apply_orientation(image, orientation), orientation
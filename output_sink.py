@@ -0,0 +1,199 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import queue
+import tarfile
+import threading
+import time
+import uuid
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+SINK_KINDS = ("directory", "zip", "tar")
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# Documents waiting for the writer; producers block beyond this (backpressure)
+MAX_PENDING = 64
+
+_STOP = object()
+
+
+def document_bytes(doc):
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+class OutputSink:
+    # Collects finished documents from any number of worker threads and writes
+    # them from one dedicated writer thread, so OCR workers never wait on slow
+    # (network) storage. Every write is recorded in a manifest.
+
+    def __init__(self, max_pending=MAX_PENDING):
+        self.manifest = []
+        self.errors = []
+        self.closed = False
+        self._names = set()
+        self._names_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def submit(self, doc, output_name, source_path, on_written=None, **details):
+        # on_written(output_name) is called from the writer thread once the
+        # document has been written, and not at all if the write fails
+        # Serialise in the calling thread so the writer only does I/O
+        data = doc if isinstance(doc, bytes) else document_bytes(doc)
+        # Returns the name the document is written under: inputs with the same
+        # name (e.g. added from different folders) get a -1, -2, ... suffix
+        output_name = self._unique_name(output_name.replace(os.sep, "/"))
+        self._queue.put((output_name, data, source_path, on_written, details))
+        return output_name
+
+    def _unique_name(self, output_name):
+        stem, extension = os.path.splitext(output_name)
+        with self._names_lock:
+            name, counter = output_name, 0
+            # Case-insensitive, as on Windows and macOS file systems
+            while name.lower() in self._names:
+                counter += 1
+                name = f"{stem}-{counter}{extension}"
+            self._names.add(name.lower())
+        return name
+
+    def close(self):
+        # Writes out everything submitted so far; only the first call does anything
+        if self.closed:
+            return self.errors
+        self.closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        try:
+            self._finish()
+        except Exception as e:
+            logger.error("Failed to finalize output: %s", e)
+            self.errors.append((None, str(e)))
+        return self.errors
+
+    def _writer(self):
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+            output_name, data, source_path, on_written, details = entry
+            try:
+                self._write(output_name, data)
+                record = {
+                    "source": source_path,
+                    "output": output_name,
+                    "size": len(data),
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                    "written_at": time.time(),
+                }
+                record.update(details)
+                self.manifest.append(record)
+            except Exception as e:
+                logger.error("Failed to write %s: %s", output_name, e)
+                self.errors.append((source_path, str(e)))
+                continue
+            if on_written is not None:
+                try:
+                    on_written(output_name)
+                except Exception as e:
+                    logger.error("Error after writing %s: %s", output_name, e)
+
+    def output_location(self, output_name):
+        # Where a document ends up, for the search index and reports
+        return os.path.join(self.location, *output_name.split("/"))
+
+    def manifest_bytes(self):
+        return "".join(json.dumps(record) + "\n" for record in self.manifest).encode("utf-8")
+
+    def _write(self, output_name, data):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+
+class DirectorySink(OutputSink):
+    # One file per document, written to a temporary name and renamed into place
+
+    def __init__(self, output_dir, **kwargs):
+        self.output_dir = output_dir
+        self.location = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        super().__init__(**kwargs)
+
+    def _write(self, output_name, data):
+        path = os.path.join(self.output_dir, *output_name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _finish(self):
+        # Appended to, so the records of earlier batches into the same directory are kept
+        path = os.path.join(self.output_dir, MANIFEST_NAME)
+        try:
+            with open(path, "rb") as f:
+                previous = f.read()
+        except FileNotFoundError:
+            previous = b""
+        if previous and not previous.endswith(b"\n"):
+            previous += b"\n"
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(previous + self.manifest_bytes())
+        os.replace(tmp_path, path)
+
+
+class ArchiveSink(OutputSink):
+    # All documents appended to one ZIP or TAR stream: a single file to create,
+    # one sequential write pattern and no per-document metadata operations
+
+    def __init__(self, archive_path, kind="zip", buffer_size=1 << 20, **kwargs):
+        self.archive_path = archive_path
+        self.location = archive_path
+        self.kind = kind
+        # Written under a temporary name so a half-written archive is never mistaken for a complete one
+        self._partial_path = f"{archive_path}.partial"
+        os.makedirs(os.path.dirname(archive_path) or os.curdir, exist_ok=True)
+        self._file = open(self._partial_path, "wb", buffering=buffer_size)
+        if kind == "zip":
+            # .docx files are already deflated, so store them as-is
+            self._archive = zipfile.ZipFile(self._file, "w", compression=zipfile.ZIP_STORED)
+        else:
+            self._archive = tarfile.open(fileobj=self._file, mode="w|")
+        super().__init__(**kwargs)
+
+    def _write(self, output_name, data):
+        if self.kind == "zip":
+            self._archive.writestr(output_name, data)
+        else:
+            info = tarfile.TarInfo(output_name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._archive.addfile(info, io.BytesIO(data))
+
+    def _finish(self):
+        self._write(MANIFEST_NAME, self.manifest_bytes())
+        self._archive.close()
+        self._file.close()
+        os.replace(self._partial_path, self.archive_path)
+
+
+def make_sink(kind, output_dir, archive_name=None):
+    if kind == "directory":
+        return DirectorySink(output_dir)
+    if kind not in SINK_KINDS:
+        raise ValueError(f"Unknown output kind: {kind}")
+
+    archive_name = archive_name or time.strftime("batch-%Y%m%d-%H%M%S")
+    extension = ".zip" if kind == "zip" else ".tar"
+    return ArchiveSink(os.path.join(output_dir, archive_name + extension), kind)
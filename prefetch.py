@@ -0,0 +1,60 @@
+import logging
+import queue
+import threading
+
+from image_store import get_store
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+
+
+def read_ahead(path):
+    # Pulls the file into the OS page cache, so the worker process that opens
+    # it next doesn't wait for a slow or network disk
+    buffer = bytearray(CHUNK_SIZE)
+    with open(path, "rb", buffering=0) as f:
+        while f.readinto(buffer):
+            pass
+
+
+class Prefetcher:
+    # Reads the inputs a batch has queued up for its OCR workers in the
+    # background, so disk and decode time overlap with OCR of earlier pages.
+    # With decode=True (OCR in this process) images are decoded into the image
+    # store; worker processes decode for themselves, so then the files are
+    # only read ahead.
+
+    def __init__(self, decode=False):
+        self.decode = decode
+        self.prefetched = 0
+        self._closed = False
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def submit(self, path):
+        self._queue.put(path)
+
+    def close(self):
+        # Whatever is still queued has been OCR'd by now
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            if self._closed:
+                continue
+            try:
+                if self.decode:
+                    get_store().get(path)
+                else:
+                    read_ahead(path)
+                self.prefetched += 1
+            except Exception as e:
+                # The conversion itself reports unreadable files
+                logger.debug("Could not prefetch %s: %s", path, e)
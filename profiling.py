@@ -0,0 +1,324 @@
+import cProfile
+import contextvars
+import io
+import itertools
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Set OCR_PROFILE=1 to profile every conversion and batch
+ENV_VAR = "OCR_PROFILE"
+
+_enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+# The profiler of the job the current thread works for; jobs running side by
+# side (a single conversion during a batch) each see their own
+_active = contextvars.ContextVar("profiling_active", default=None)
+
+# tracemalloc is process-wide: the first profiled job starts it, the last one stops it
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracemalloc = False
+
+_NULL_STAGE = nullcontext()
+
+# Lazy imports and tracemalloc's own bookkeeping would otherwise top every list
+_EXCLUDED_FILES = frozenset({
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    tracemalloc.__file__,
+})
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(value):
+    global _enabled
+    _enabled = bool(value)
+
+
+def active():
+    # The profiler of the current thread's job, if it is being profiled
+    return _active.get()
+
+
+def stage(name):
+    # Time a pipeline stage of the running job; a shared no-op when not profiling
+    profiler = _active.get()
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name)
+
+
+def carry(func):
+    # For work handed to other threads (a thread pool) on behalf of the
+    # current job: func then runs under the same profiler
+    profiler = _active.get()
+    if profiler is None:
+        return func
+
+    def run(*args, **kwargs):
+        token = _active.set(profiler)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _active.reset(token)
+    return run
+
+
+def capture(func, *args):
+    # Runs func with its stages and Tesseract runs timed, for work done in an
+    # OCR worker process on behalf of a profiled job: returns func's result
+    # and the timings, which the job takes in with merge()
+    was_enabled = _enabled
+    set_enabled(True)
+    profiler = JobProfiler(None, "worker", allocations=False)
+    _start_tracing()
+    token = _active.set(profiler)
+    try:
+        result = func(*args)
+    finally:
+        _active.reset(token)
+        _stop_tracing()
+        set_enabled(was_enabled)
+    return result, profiler.timings()
+
+
+def merge(timings):
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.merge(timings)
+
+
+def top_allocations(limit):
+    # Empty if nothing is being traced (e.g. tracemalloc was stopped by someone else)
+    try:
+        snapshot = tracemalloc.take_snapshot()
+    except RuntimeError:
+        return []
+    # Filtering the grouped lines rather than every trace (snapshot.filter_traces
+    # is pure Python) keeps this fast with hundreds of thousands of traces
+    statistics = (stat for stat in snapshot.statistics("lineno")
+                  if stat.traceback[0].filename not in _EXCLUDED_FILES)
+    return list(itertools.islice(statistics, limit))
+
+
+def record_subprocess(name, seconds):
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.record_subprocess(name, seconds)
+
+
+def _start_tracing():
+    global _tracing_users, _started_tracemalloc
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+            _started_tracemalloc = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users, _started_tracemalloc
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _started_tracemalloc:
+            tracemalloc.stop()
+            _started_tracemalloc = False
+
+
+class StageStats:
+    __slots__ = ("count", "total", "max", "peak_memory", "top_allocations")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.peak_memory = 0
+        self.top_allocations = []
+
+
+class JobProfiler:
+    # cProfile for every thread that runs work through run(), tracemalloc peaks
+    # and top allocations per stage, and wall time of each Tesseract process
+
+    def __init__(self, output_dir, name, allocations=True):
+        self.output_dir = output_dir
+        self.name = name
+        # Whether stages record their top allocations, which takes a snapshot
+        self.allocations = allocations
+        self.stages = {}
+        self.subprocesses = {}
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._token = None
+        # Highest traced memory seen in this process; stages reset tracemalloc's own peak
+        self._peak_memory = 0
+
+    def start(self):
+        # Profiles the calling thread's work from here on; other threads join in through run()
+        _start_tracing()
+        self.start_time = time.perf_counter()
+        self._token = _active.set(self)
+
+    def stop(self):
+        _active.reset(self._token)
+        self.elapsed = time.perf_counter() - self.start_time
+        self.peak_memory = max(self._peak_memory, tracemalloc.get_traced_memory()[1])
+        self.final_allocations = top_allocations(15)
+        _stop_tracing()
+
+    def run(self, func, *args, **kwargs):
+        # Runs func (usually in a worker thread) as part of this job. cProfile
+        # only sees the thread it is enabled in, so each call gets its own profile.
+        token = _active.set(self)
+        try:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process; concurrent calls run unprofiled
+                return func(*args, **kwargs)
+            with self._lock:
+                self._profiles.append(profile)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+        finally:
+            _active.reset(token)
+
+    @contextmanager
+    def stage(self, name):
+        # Peaks are process-wide, so with parallel workers (or jobs) they cover
+        # overlapping stages too. Timing never fails the work being timed.
+        if tracemalloc.is_tracing():
+            with self._lock:
+                self._peak_memory = max(self._peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            with self._lock:
+                stats = self.stages.setdefault(name, StageStats())
+                stats.count += 1
+                stats.total += elapsed
+                stats.max = max(stats.max, elapsed)
+                self._peak_memory = max(self._peak_memory, peak)
+                if peak > stats.peak_memory and tracemalloc.is_tracing():
+                    stats.peak_memory = peak
+                    if self.allocations:
+                        stats.top_allocations = top_allocations(5)
+
+    def record_subprocess(self, name, seconds):
+        with self._lock:
+            self.subprocesses.setdefault(name, []).append(seconds)
+
+    def timings(self):
+        # Picklable stage and subprocess timings (allocations stay behind)
+        with self._lock:
+            stages = {name: (stats.count, stats.total, stats.max, stats.peak_memory)
+                      for name, stats in self.stages.items()}
+            return {"stages": stages, "subprocesses": {name: list(durations)
+                                                       for name, durations in self.subprocesses.items()}}
+
+    def merge(self, timings):
+        # Stage peaks from a worker process are that process's own
+        with self._lock:
+            for name, (count, total, longest, peak) in timings["stages"].items():
+                stats = self.stages.setdefault(name, StageStats())
+                stats.count += count
+                stats.total += total
+                stats.max = max(stats.max, longest)
+                stats.peak_memory = max(stats.peak_memory, peak)
+            for name, durations in timings["subprocesses"].items():
+                self.subprocesses.setdefault(name, []).extend(durations)
+
+    def write_reports(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile-{self.name}-{time.strftime('%Y%m%d-%H%M%S')}")
+
+        stats = None
+        for profile in self._profiles:
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+        if stats is not None:
+            stats.dump_stats(base + ".pstats")
+
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(self.summary(stats))
+
+        logger.info("Profile written to %s.txt", base)
+        return base
+
+    def summary(self, stats):
+        lines = [f"Profile of {self.name}", f"Wall time: {self.elapsed:.2f}s",
+                 f"Peak traced memory: {self.peak_memory / 1e6:.1f} MB", ""]
+
+        lines.append(f"{'stage':<14} {'calls':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'peak MB':>9}")
+        for name, stage_stats in self.stages.items():
+            lines.append(f"{name:<14} {stage_stats.count:>6} {stage_stats.total:>9.2f} "
+                         f"{stage_stats.total / stage_stats.count * 1000:>9.1f} {stage_stats.max * 1000:>9.1f} "
+                         f"{stage_stats.peak_memory / 1e6:>9.1f}")
+        lines.append("")
+
+        for name, durations in self.subprocesses.items():
+            lines.append(f"{name} processes: {len(durations)}, total {sum(durations):.2f}s, "
+                         f"mean {sum(durations) / len(durations) * 1000:.1f} ms, max {max(durations) * 1000:.1f} ms")
+        lines.append("")
+
+        for name, stage_stats in self.stages.items():
+            if stage_stats.top_allocations:
+                lines.append(f"Top allocations held after the highest-peak '{name}' stage:")
+                lines.extend(f"  {stat}" for stat in stage_stats.top_allocations)
+        lines.append("")
+
+        lines.append("Top allocations still held at the end of the job:")
+        lines.extend(f"  {stat}" for stat in self.final_allocations)
+        lines.append("")
+
+        if stats is not None:
+            buffer = io.StringIO()
+            stats.stream = buffer
+            stats.sort_stats("cumulative").print_stats(30)
+            lines.append(buffer.getvalue())
+
+        return "\n".join(lines) + "\n"
+
+
+class NullProfiler:
+    # Stand-in used when profiling is off: run() is a plain call
+
+    def run(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+@contextmanager
+def job(output_dir, name):
+    # Wrap a single conversion or a batch run. Reports land in output_dir.
+    if not _enabled:
+        yield NullProfiler()
+        return
+
+    profiler = JobProfiler(output_dir, name)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        try:
+            profiler.write_reports()
+        except OSError as e:
+            logger.error("Could not write profile: %s", e)
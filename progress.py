@@ -0,0 +1,95 @@
+import collections
+import queue
+import time
+
+# Completions the files/sec moving average is computed over
+RATE_WINDOW = 50
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class ProgressChannel:
+    # Worker threads post events from any thread; the Tk thread drains them on
+    # a timer, so a burst of completions costs one redraw instead of one
+    # after() callback each, and failures are collected for a single report
+
+    def __init__(self, rate_window=RATE_WINDOW):
+        self._events = queue.SimpleQueue()
+        self._times = collections.deque(maxlen=rate_window)
+        self.started_at = time.monotonic()
+        self.completed = 0
+        self.failed = 0
+        self.last_name = None
+        # (name, error) pairs, in the order they happened
+        self.errors = []
+        # Set by finish(); the batch thread's final counts
+        self.result = None
+
+    # Producer side
+    def item_done(self, name):
+        self._events.put(("done", name, None, time.monotonic()))
+
+    def item_failed(self, name, error):
+        self._events.put(("failed", name, error, time.monotonic()))
+
+    def error(self, name, error):
+        # A failure that isn't a completion of its own, e.g. a write error after OCR
+        self._events.put(("error", name, error, None))
+
+    def finish(self, **result):
+        self._events.put(("finish", None, result, None))
+
+    # Consumer side (Tk thread)
+    def drain(self):
+        # Applies every pending event; True if anything changed
+        changed = False
+        while True:
+            try:
+                kind, name, data, timestamp = self._events.get_nowait()
+            except queue.Empty:
+                return changed
+            changed = True
+            if kind == "finish":
+                self.result = data
+                continue
+            if kind == "error":
+                self.errors.append((name, data))
+                continue
+            self.completed += 1
+            self.last_name = name
+            self._times.append(timestamp)
+            if kind == "failed":
+                self.failed += 1
+                self.errors.append((name, data))
+
+    def rate(self):
+        # Files per second over the last RATE_WINDOW completions
+        if not self._times:
+            return 0.0
+        if len(self._times) == self._times.maxlen:
+            count, start = len(self._times) - 1, self._times[0]
+        else:
+            count, start = len(self._times), self.started_at
+        elapsed = self._times[-1] - start
+        return count / elapsed if elapsed > 0 else 0.0
+
+    def eta(self, total):
+        rate = self.rate()
+        if not rate:
+            return None
+        return max(0, total - self.completed) / rate
+
+    def describe(self, total):
+        return (f"Processed {self.completed} of {total} ({self.rate():.1f} files/s, "
+                f"ETA {format_eta(self.eta(total))})")
+
+    def error_report(self):
+        return "\n".join(f"{name}: {error}" for name, error in self.errors)
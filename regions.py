@@ -0,0 +1,88 @@
+import json
+import math
+
+# Regions are (label, (left, top, right, bottom)) with the box given as
+# fractions of the image file's width and height, in the file's own
+# orientation. That keeps a template valid for every scan of the same form,
+# whatever its resolution and however the preview is zoomed or rotated.
+
+TEMPLATE_VERSION = 1
+
+
+def normalize_regions(regions):
+    # Tuples all the way down, so settings that include regions stay hashable
+    # (JSON round trips, e.g. through the work queue, turn them into lists)
+    return tuple((str(label), tuple(float(value) for value in box)) for label, box in regions or ())
+
+
+def _rotate(dx, dy, angle):
+    # Clockwise on screen (y points down) by angle degrees
+    radians = math.radians(angle)
+    cos, sin = math.cos(radians), math.sin(radians)
+    return dx * cos - dy * sin, dx * sin + dy * cos
+
+
+def preview_to_image(x, y, scale, angle, image_size, rotated_size):
+    # A point on the preview, which shows the image rotated clockwise by angle
+    # (expanded to rotated_size) and scaled, to a pixel position in the image
+    rx, ry = x / scale - rotated_size[0] / 2, y / scale - rotated_size[1] / 2
+    dx, dy = _rotate(rx, ry, -angle)
+    return dx + image_size[0] / 2, dy + image_size[1] / 2
+
+
+def image_to_preview(x, y, scale, angle, image_size, rotated_size):
+    dx, dy = _rotate(x - image_size[0] / 2, y - image_size[1] / 2, angle)
+    return (dx + rotated_size[0] / 2) * scale, (dy + rotated_size[1] / 2) * scale
+
+
+def _bounds(points):
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def box_from_preview(x0, y0, x1, y1, scale, angle, image_size, rotated_size):
+    # A rectangle dragged on the preview as a fractional box of the image. With
+    # a skewed preview the dragged rectangle is tilted in the image, so its
+    # bounding box is used.
+    corners = [preview_to_image(x, y, scale, angle, image_size, rotated_size)
+               for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))]
+    left, top, right, bottom = _bounds(corners)
+    width, height = image_size
+    return (max(0.0, left / width), max(0.0, top / height), min(1.0, right / width), min(1.0, bottom / height))
+
+
+def box_to_preview(box, scale, angle, image_size, rotated_size):
+    width, height = image_size
+    left, top, right, bottom = box[0] * width, box[1] * height, box[2] * width, box[3] * height
+    corners = [image_to_preview(x, y, scale, angle, image_size, rotated_size)
+               for x, y in ((left, top), (right, top), (right, bottom), (left, bottom))]
+    return _bounds(corners)
+
+
+def box_pixels(box, image_size):
+    width, height = image_size
+    return (int(box[0] * width), int(box[1] * height),
+            max(int(box[0] * width) + 1, math.ceil(box[2] * width)),
+            max(int(box[1] * height) + 1, math.ceil(box[3] * height)))
+
+
+def save_template(path, regions):
+    data = {
+        "version": TEMPLATE_VERSION,
+        "regions": [{"label": label, "box": list(box)} for label, box in normalize_regions(regions)],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_template(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    regions = []
+    for region in data.get("regions", ()):
+        box = region["box"]
+        if len(box) != 4 or not (0 <= box[0] < box[2] <= 1 and 0 <= box[1] < box[3] <= 1):
+            raise ValueError(f"Invalid region box in {path}: {box}")
+        regions.append((region.get("label") or f"Region {len(regions) + 1}", box))
+    return normalize_regions(regions)
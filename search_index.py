@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from env_probe import cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Overrides the index location; set to "off" to stop indexing conversions
+ENV_VAR = "OCR_INDEX"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    output TEXT,
+    language TEXT,
+    content_hash TEXT NOT NULL,
+    indexed_at REAL NOT NULL,
+    UNIQUE (source, page)
+);
+-- rowid is pages.id
+CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5(text, tokenize = 'unicode61 remove_diacritics 2');
+"""
+
+SearchResult = namedtuple("SearchResult", "source output page language snippet rank")
+
+
+def default_index_path():
+    override = os.environ.get(ENV_VAR)
+    if override and override != "off":
+        return override
+    return os.path.join(cache_dir(), "index.sqlite3")
+
+
+def indexing_enabled():
+    return os.environ.get(ENV_VAR) != "off"
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class SearchIndex:
+    # SQLite FTS5 index of OCR text, one row per page. Writes come from many
+    # worker threads, so they share one connection behind a lock.
+
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        # WAL lets searches run while a batch is writing; NORMAL skips an fsync per commit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _add(self, source, text, output, page, language):
+        # Returns True if the page was new or its text changed
+        digest = content_hash(text)
+        row = self._conn.execute("SELECT id, content_hash, output, language FROM pages WHERE source = ? AND page = ?",
+                                 (source, page)).fetchone()
+        if row is None:
+            cursor = self._conn.execute(
+                "INSERT INTO pages (source, page, output, language, content_hash, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (source, page, output, language, digest, time.time()))
+            self._conn.execute("INSERT INTO page_text (rowid, text) VALUES (?, ?)", (cursor.lastrowid, text))
+            return True
+
+        page_id, old_digest, old_output, old_language = row
+        if old_digest == digest:
+            # Same text: the full-text entry stays, only the metadata may have moved
+            if (old_output, old_language) != (output, language):
+                self._conn.execute("UPDATE pages SET output = ?, language = ? WHERE id = ?",
+                                   (output, language, page_id))
+            return False
+
+        self._conn.execute("UPDATE pages SET output = ?, language = ?, content_hash = ?, indexed_at = ? WHERE id = ?",
+                           (output, language, digest, time.time(), page_id))
+        self._conn.execute("DELETE FROM page_text WHERE rowid = ?", (page_id,))
+        self._conn.execute("INSERT INTO page_text (rowid, text) VALUES (?, ?)", (page_id, text))
+        return True
+
+    def add(self, source, text, output=None, page=1, language=None):
+        with self._lock, self._conn:
+            return self._add(source, text, output, page, language)
+
+    def add_many(self, records):
+        # records: (source, text, output, page, language) tuples, written in one transaction
+        changed = 0
+        with self._lock, self._conn:
+            for source, text, output, page, language in records:
+                changed += self._add(source, text, output, page, language)
+        return changed
+
+    def remove(self, source):
+        with self._lock, self._conn:
+            ids = [row[0] for row in self._conn.execute("SELECT id FROM pages WHERE source = ?", (source,))]
+            self._conn.executemany("DELETE FROM page_text WHERE rowid = ?", ((page_id,) for page_id in ids))
+            self._conn.execute("DELETE FROM pages WHERE source = ?", (source,))
+        return len(ids)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM pages").fetchone()[0]
+
+    def search(self, query, limit=50, language=None, order="rank"):
+        # query uses FTS5 syntax: words, "exact phrases", prefix*, AND/OR/NOT.
+        # order="rank" sorts by relevance (bm25), which has to score every match;
+        # order="recent" returns the most recently (re)indexed pages first and
+        # skips the scoring, so it stays fast for words that occur on most pages.
+        sql = ("SELECT pages.source, pages.output, pages.page, pages.language, "
+               "snippet(page_text, 0, '[', ']', '...', 12), bm25(page_text) AS rank "
+               "FROM page_text JOIN pages ON pages.id = page_text.rowid WHERE page_text MATCH ?")
+        params = [query]
+        if language:
+            sql += " AND pages.language = ?"
+            params.append(language)
+        sql += " ORDER BY rank LIMIT ?" if order == "rank" else " ORDER BY pages.indexed_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            try:
+                return [SearchResult(*row) for row in self._conn.execute(sql, params)]
+            except sqlite3.OperationalError as e:
+                # Almost always FTS5 query syntax, e.g. an unterminated quote
+                raise ValueError(f"Invalid search query: {e}") from e
+
+
+_index = None
+_index_lock = threading.Lock()
+# Set after the first failure (e.g. an unwritable cache directory), so a batch
+# doesn't retry and warn for every page
+_index_failed = False
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        return _index
+
+
+def index_conversion(source, output, text, language):
+    # Called after every conversion; indexing problems never fail the conversion itself
+    global _index_failed
+    if _index_failed or not indexing_enabled():
+        return
+    try:
+        get_index().add(os.path.abspath(source), text, output, language=language)
+    except (sqlite3.Error, OSError) as e:
+        _index_failed = True
+        logger.warning("Could not index %s: %s; search indexing is off for this session", source, e)
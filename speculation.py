@@ -0,0 +1,121 @@
+import logging
+import threading
+from concurrent.futures import Future
+
+import ocr_pipeline
+from cpu_budget import get_budget
+from ocr_supervisor import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+# Speculative OCR runs at this niceness (Tesseract inherits it), so it only
+# takes CPU time nothing else wants
+NICE = 10
+
+
+class _Speculation:
+    __slots__ = ("key", "image_path", "settings", "future", "runners", "hurried")
+
+    def __init__(self, key, image_path, settings):
+        self.key = key
+        self.image_path = image_path
+        self.settings = settings
+        self.future = Future()
+        self.runners = 0
+        self.hurried = False
+
+
+class Speculator:
+    # OCR of the image the user is looking at, started as soon as it is loaded
+    # so that previewing or converting it can use the result instead of
+    # waiting for a fresh OCR. One speculation at a time, in its own worker
+    # process: starting another one, or cancelling, kills the previous run.
+    # Once someone waits for the result, hurry() races a normal-priority run
+    # against it, so a busy machine never leaves the user waiting on a
+    # low-priority process. Both runs take a slot of the process's CPU budget
+    # (WorkerPool.run does), like any other OCR.
+
+    def __init__(self):
+        self._pool = None
+        self._urgent_pool = None
+        self._lock = threading.Lock()
+        self._current = None
+
+    def start(self, key, image_path, settings):
+        # key identifies the text the run produces, e.g. JobSpec.text_key(image_path)
+        with self._lock:
+            if self._current is not None and key == self._current.key:
+                return
+            self._cancel()
+            if self._pool is None:
+                self._pool = WorkerPool(1, nice=NICE)
+            self._current = _Speculation(key, image_path, settings)
+            self._launch(self._current, self._pool)
+        logger.debug("Speculative OCR of %s", image_path)
+
+    def _launch(self, speculation, pool):
+        speculation.runners += 1
+        threading.Thread(target=self._run, args=(speculation, pool), daemon=True).start()
+
+    def _run(self, speculation, pool):
+        try:
+            result, error = pool.run(ocr_pipeline.read_page, speculation.image_path, speculation.settings), None
+        except Exception as e:
+            result, error = None, e
+        with self._lock:
+            speculation.runners -= 1
+            future = speculation.future
+            if future.done():
+                # Cancelled, or the other run was faster
+                return
+            if error is None:
+                future.set_result(result)
+                if speculation.runners:
+                    # Kill the slower run
+                    other = self._urgent_pool if pool is self._pool else self._pool
+                    other.cancel()
+            elif not speculation.runners:
+                future.set_exception(error)
+
+    def result(self, key):
+        # A Future of (text, details) if the current run matches key, else None.
+        # The run may still be going; future.result() then waits for it.
+        with self._lock:
+            current = self._current
+            return current.future if current is not None and key is not None and key == current.key else None
+
+    def hurry(self, future):
+        # For a caller about to wait on a future from result(): the page is
+        # also read at normal priority, and whichever run finishes first wins
+        with self._lock:
+            current = self._current
+            if current is None or current.future is not future or current.hurried or future.done():
+                return
+            current.hurried = True
+            if self._urgent_pool is None:
+                self._urgent_pool = WorkerPool(1)
+            if get_budget().full():
+                # No slot for a second run, and the speculative run may hold the
+                # last one: stop it rather than wait for it at low priority
+                self._pool.cancel()
+            self._launch(current, self._urgent_pool)
+        logger.debug("Hurrying speculative OCR of %s", current.image_path)
+
+    def _cancel(self):
+        # Waiters on a cancelled future get CancelledError
+        if self._current is not None and self._current.future.cancel():
+            for pool in (self._pool, self._urgent_pool):
+                if pool is not None:
+                    pool.cancel()
+        self._current = None
+
+    def cancel(self):
+        with self._lock:
+            self._cancel()
+
+    def close(self):
+        with self._lock:
+            self._cancel()
+            for pool in (self._pool, self._urgent_pool):
+                if pool is not None:
+                    pool.close()
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from env_probe import cache_dir
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (48, 48)
+
+# Most PhotoImages kept alive at once; a screenful of rows needs far fewer
+MEMORY_LIMIT = 256
+
+
+def thumbnail_cache_dir():
+    return os.path.join(cache_dir(), "thumbnails")
+
+
+def make_thumbnail(path, size=THUMBNAIL_SIZE):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        # JPEGs can be decoded at 1/2, 1/4 or 1/8 scale, which skips most of the work
+        image.draft("RGB", (size[0] * 2, size[1] * 2))
+        # Other formats are shrunk with reduce() first, then resampled
+        image.thumbnail(size, reducing_gap=2.0)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        return image.copy()
+
+
+class ThumbnailCache:
+    # Thumbnails for the batch list. Generated by one low-priority background
+    # thread, persisted on disk keyed by path, size and mtime, and held in
+    # memory as a bounded LRU of PhotoImages. Only rows the view asks for are
+    # ever generated.
+
+    def __init__(self, on_ready=None, directory=None, size=THUMBNAIL_SIZE, memory_limit=MEMORY_LIMIT):
+        self.directory = directory or thumbnail_cache_dir()
+        self.size = size
+        self.memory_limit = memory_limit
+        self.on_ready = on_ready
+
+        self._photos = OrderedDict()
+        self._ready = {}
+        self._wanted = []
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def key_for(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        raw = f"{path}|{st.st_size}|{st.st_mtime_ns}|{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def disk_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    # Tk thread: never touches the disk, which may be a slow network share
+    def get(self, path):
+        # Returns a PhotoImage, or None if the thumbnail isn't available yet
+        photo = self._photos.get(path)
+        if photo is not None:
+            self._photos.move_to_end(path)
+            return photo
+
+        with self._lock:
+            image = self._ready.pop(path, None)
+        if image is None:
+            return None
+
+        from PIL import ImageTk
+
+        photo = ImageTk.PhotoImage(image)
+        self._photos[path] = photo
+        while len(self._photos) > self.memory_limit:
+            self._photos.popitem(last=False)
+        return photo
+
+    def request(self, paths):
+        # Replace the wish list with the rows currently on screen
+        missing = [path for path in paths if path not in self._photos and path not in self._failed]
+        on_screen = set(paths)
+        with self._lock:
+            self._wanted = missing
+            # Thumbnails finished for rows that have since scrolled away are
+            # dropped; the disk cache has them if the rows come back
+            for path in [path for path in self._ready if path not in on_screen]:
+                del self._ready[path]
+        if missing:
+            self._ensure_thread()
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+
+    # Background thread
+    def _worker(self):
+        try:
+            # Linux applies nice values per thread; elsewhere this is best effort
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                if not self._wanted:
+                    self._wakeup.clear()
+                    continue
+                path = self._wanted.pop(0)
+                if path in self._ready:
+                    continue
+
+            image = self._load_or_generate(path)
+            if image is None:
+                self._failed.add(path)
+                continue
+
+            with self._lock:
+                # Only rows still wanted or on screen get here, but keep a hard bound anyway
+                if len(self._ready) < self.memory_limit:
+                    self._ready[path] = image
+            if self.on_ready:
+                self.on_ready()
+
+    def _load_or_generate(self, path):
+        from PIL import Image
+
+        key = self.key_for(path)
+        if key is None:
+            return None
+
+        disk_path = self.disk_path(key)
+        try:
+            with Image.open(disk_path) as cached:
+                return cached.copy()
+        except OSError:
+            pass
+
+        try:
+            image = make_thumbnail(path, self.size)
+        except Exception as e:
+            logger.debug("No thumbnail for %s: %s", path, e)
+            return None
+
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            tmp_path = f"{disk_path}.{threading.get_ident()}.tmp"
+            image.save(tmp_path, format="PNG")
+            os.replace(tmp_path, disk_path)
+        except OSError as e:
+            logger.debug("Could not cache thumbnail for %s: %s", path, e)
+        return image
@@ -0,0 +1,143 @@
+import logging
+import time
+import tkinter
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Heartbeat period and the lateness that counts as a stall, in ms
+INTERVAL_MS = 100
+STALL_MS = 200
+
+# Upper bounds of the lateness histogram buckets, in ms
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+# The monitor Tk callbacks are reported to, and tkinter's own CallWrapper
+_installed = None
+_original_call_wrapper = tkinter.CallWrapper
+
+
+class TimedCallWrapper(tkinter.CallWrapper):
+    # Tk keeps the wrapper of every callback registered while a monitor was
+    # installed, so these look the monitor up on each call
+    def __call__(self, *args):
+        monitor = _installed
+        if monitor is None:
+            return super().__call__(*args)
+        start = time.perf_counter()
+        try:
+            return super().__call__(*args)
+        finally:
+            monitor.handler_finished(self.func, time.perf_counter() - start)
+
+
+def handler_name(func):
+    # after() wraps its callback in a local callit(); report the callback itself
+    code = getattr(func, "__code__", None)
+    if code is not None and code.co_name == "callit" and func.__closure__:
+        func = dict(zip(code.co_freevars, (cell.cell_contents for cell in func.__closure__))).get("func", func)
+    func = getattr(func, "__func__", func)
+    name = getattr(func, "__qualname__", None) or type(func).__qualname__
+    if name.endswith("<lambda>") and hasattr(func, "__code__"):
+        name += f" ({func.__code__.co_filename.rsplit('/', 1)[-1]}:{func.__code__.co_firstlineno})"
+    return name
+
+
+class LatencyMonitor:
+    # Measures how responsive the Tk event loop is: a heartbeat is scheduled
+    # with after() and its lateness is how long the loop was busy elsewhere.
+    # Every Tk callback is timed as well, so a stall can be put down to the
+    # slowest handler that ran in between. Tk thread only.
+
+    def __init__(self, root, interval_ms=INTERVAL_MS, stall_ms=STALL_MS, on_update=None):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        # Called with the monitor about once a second, and after every stall
+        self.on_update = on_update
+        self.histogram = Counter()
+        self.stall_counts = Counter()
+        self.stall_totals_ms = Counter()
+        self.beats = 0
+        self.current_ms = 0.0
+        self.worst_ms = 0.0
+        self.worst_handler = None
+        self._slowest = (0.0, None)
+        self._expected = None
+        self._running = False
+
+    def install(self):
+        # Times every Python callback Tk makes from now on (commands, bindings,
+        # after() and variable traces), so install before building the UI.
+        # One monitor per process: installing another one takes over from it.
+        global _installed
+        if _installed is not None and _installed is not self:
+            logger.debug("Replacing the installed UI latency monitor")
+        _installed = self
+        tkinter.CallWrapper = TimedCallWrapper
+
+    def uninstall(self):
+        # Back to plain tkinter callbacks, if this is the installed monitor
+        global _installed
+        if _installed is self:
+            _installed = None
+            tkinter.CallWrapper = _original_call_wrapper
+
+    def handler_finished(self, func, seconds):
+        if seconds > self._slowest[0]:
+            self._slowest = (seconds, func)
+
+    def start(self):
+        self._running = True
+        self._schedule()
+
+    def stop(self):
+        self._running = False
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self.root.after(self.interval_ms, self._beat)
+
+    def _beat(self):
+        if not self._running:
+            return
+        late_ms = max(0.0, (time.perf_counter() - self._expected) * 1000)
+        seconds, func = self._slowest
+        self._slowest = (0.0, None)
+
+        self.beats += 1
+        self.current_ms = late_ms
+        self.histogram[next(bound for bound in BUCKETS_MS if late_ms <= bound)] += 1
+        stalled = late_ms >= self.stall_ms
+        if stalled:
+            # Tk's own work (redraws, geometry) and native dialogs run no Python callback
+            handler = handler_name(func) if func is not None and seconds * 1000 >= self.stall_ms / 2 else "(untracked)"
+            self.stall_counts[handler] += 1
+            self.stall_totals_ms[handler] += late_ms
+            if late_ms > self.worst_ms:
+                self.worst_ms, self.worst_handler = late_ms, handler
+            logger.warning("UI stalled for %.0f ms in %s", late_ms, handler)
+
+        if self.on_update and (stalled or self.beats % max(1, 1000 // self.interval_ms) == 0):
+            self.on_update(self)
+        self._schedule()
+
+    def describe(self):
+        # For the status bar
+        return f"UI: {self.current_ms:.0f} ms (worst {self.worst_ms:.0f} ms)"
+
+    def report(self):
+        # Lateness histogram and the handlers behind the stalls, for the log
+        lines = [f"UI latency over {self.beats} heartbeats of {self.interval_ms} ms:"]
+        previous = 0
+        for bound in BUCKETS_MS:
+            count = self.histogram[bound]
+            if count:
+                label = f"{previous}-{bound:.0f} ms" if bound != float("inf") else f">{previous} ms"
+                lines.append(f"  {label:>14} {count:>7} {count / self.beats:7.1%}")
+            previous = bound
+        if self.stall_counts:
+            lines.append(f"Stalls of {self.stall_ms} ms or more:")
+            for handler, count in self.stall_counts.most_common():
+                lines.append(f"  {count:>5} x {handler} ({self.stall_totals_ms[handler] / count:.0f} ms average)")
+        return "\n".join(lines)
@@ -1,18 +1,46 @@
 import os
+import logging
 import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ThreadPoolExecutor, wait
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox, scrolledtext
-from PIL import Image, ImageTk, ImageEnhance, ImageOps
-import pytesseract
-from docx import Document
-from docx.shared import Pt, RGBColor, Inches
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-import math
-
+from batch_queue import DONE, FAILED, BatchQueue
+from batch_view import VirtualListView
+from cpu_budget import get_budget
+import env_probe
+from image_store import get_store
+from file_enum import IMAGE_EXTENSIONS, iter_chunks, iter_image_files, split_patterns
+from job_spec import JobSpec
+import ocr_pipeline
+from ocr_profiles import DEFAULT_PROFILE, profile_names
+from ocr_supervisor import Quarantine, WorkerPool
+from orientation import detect_orientation
+from output_sink import SINK_KINDS, make_sink
+import profiling
+from prefetch import Prefetcher
+from progress import ProgressChannel
+from regions import box_from_preview, box_to_preview, load_template, save_template
+from search_index import get_index
+from speculation import Speculator
+from thumbnail_cache import ThumbnailCache
+from ui_monitor import LatencyMonitor
+from work_queue import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+# Settings changes are batched for this long before background OCR restarts,
+# so dragging a slider doesn't start a run per step
+SPECULATION_DELAY_MS = 600
 
 class OCRtoWordGUI:
     def __init__(self, root):
         self.root = root
+        # Installed before any widget exists so every callback is timed
+        self.monitor = LatencyMonitor(root, on_update=self.on_latency_update)
+        self.monitor.install()
+
         self.root.title("Advanced OCR to Word Converter")
         self.root.geometry("1000x700")
         self.root.minsize(900, 600)
@@ -21,15 +49,34 @@ class OCRtoWordGUI:
         self.input_image_path = tk.StringVar()
         self.output_doc_path = tk.StringVar()
         self.language = tk.StringVar(value="eng")
+        self.detect_language = tk.BooleanVar(value=False)
+        self.allowed_languages = tk.StringVar(value="eng+fra+deu")
         self.status_message = tk.StringVar(value="Ready")
         self.preview_image = None
         self.original_image = None
+        self.loaded_image_path = None
+        self.image_modified = False
         self.preview_scale = 1.0
         self.rotation_angle = 0
+        # Size of the rotated image the preview was scaled from
+        self.preview_source_size = None
+
+        # Regions to OCR instead of the whole page: (label, fractional box) pairs
+        self.regions = []
+        self.region_drag_start = None
+        self.region_info = tk.StringVar(value="Whole page")
 
         # Batch processing variables
-        self.batch_files = []
+        self.batch_files = BatchQueue()
+        self.batch_running = False
+        # Number of folder ingests still feeding the queue
+        self.ingest_count = 0
+        self.include_patterns = tk.StringVar()
+        self.exclude_patterns = tk.StringVar()
+        self.show_thumbnails = tk.BooleanVar(value=True)
+        self.thumbnail_refresh_pending = False
         self.batch_mode = tk.BooleanVar(value=False)
+        self.retry_quarantined = tk.BooleanVar(value=False)
 
         # Document formatting variables
         self.font_family = tk.StringVar(value="Calibri")
@@ -45,6 +92,13 @@ class OCRtoWordGUI:
         self.binarize = tk.BooleanVar(value=False)
         self.threshold = tk.IntVar(value=127)
 
+        self.auto_orient = tk.BooleanVar(value=False)
+
+        # OCR engine variables
+        self.ocr_profile = tk.StringVar(value=DEFAULT_PROFILE)
+        self.models_dir = tk.StringVar()
+        self.sparse_text = tk.BooleanVar(value=False)
+
         # Available OCR languages
         self.languages = {
             "English": "eng",
@@ -84,22 +138,37 @@ class OCRtoWordGUI:
         self.batch_tab = ttk.Frame(self.notebook)
         self.format_tab = ttk.Frame(self.notebook)
         self.process_tab = ttk.Frame(self.notebook)
+        self.search_tab = ttk.Frame(self.notebook)
 
         self.notebook.add(self.main_tab, text="Main")
         self.notebook.add(self.batch_tab, text="Batch Processing")
         self.notebook.add(self.format_tab, text="Document Format")
         self.notebook.add(self.process_tab, text="Image Processing")
+        self.notebook.add(self.search_tab, text="Search")
 
         # Create the UI elements
         self.create_main_tab()
         self.create_batch_tab()
         self.create_format_tab()
         self.create_process_tab()
+        self.create_search_tab()
         self.create_status_bar()
 
         # Create the extracted text preview window (initially hidden)
         self.text_preview_window = None
 
+        # Hidden switch for profiling reports (also enabled by OCR_PROFILE=1)
+        self.root.bind_all("<Control-Shift-KeyPress-P>", self.toggle_profiling)
+
+        # Background OCR of the loaded image with the current settings; formatting
+        # settings don't change the text, so only the OCR ones restart it
+        self.speculator = Speculator()
+        self.speculation_pending = None
+        for var in (self.language, self.detect_language, self.allowed_languages, self.ocr_profile, self.models_dir,
+                    self.sparse_text, self.brightness, self.contrast, self.sharpen, self.binarize, self.threshold,
+                    self.auto_orient):
+            var.trace_add("write", self.schedule_speculation)
+
     def create_main_tab(self):
         main_frame = ttk.Frame(self.main_tab, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -114,11 +183,16 @@ class OCRtoWordGUI:
         ttk.Button(input_frame, text="Browse...", command=self.browse_input_image).grid(row=0, column=2, pady=5)
 
         ttk.Label(input_frame, text="Language:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        language_combo = ttk.Combobox(input_frame, textvariable=self.language, state="readonly")
-        language_combo['values'] = list(self.languages.keys())
-        language_combo.current(0)
-        language_combo.grid(row=1, column=1, sticky=tk.W, pady=5, padx=5)
-        language_combo.bind('<<ComboboxSelected>>', self.on_language_selected)
+        self.language_combo = ttk.Combobox(input_frame, textvariable=self.language, state="readonly")
+        self.language_combo['values'] = list(self.languages.keys())
+        self.language_combo.current(0)
+        self.language_combo.grid(row=1, column=1, sticky=tk.W, pady=5, padx=5)
+        self.language_combo.bind('<<ComboboxSelected>>', self.on_language_selected)
+
+        ttk.Checkbutton(input_frame, text="Detect language per page from:",
+                        variable=self.detect_language).grid(row=2, column=0, sticky=tk.W, pady=5)
+        ttk.Entry(input_frame, textvariable=self.allowed_languages, width=30).grid(row=2, column=1, sticky=tk.W,
+                                                                                    pady=5, padx=5)
 
         # Preview section with zoom and rotate controls
         preview_frame = ttk.LabelFrame(main_frame, text="Image Preview", padding="10")
@@ -140,6 +214,11 @@ class OCRtoWordGUI:
         self.canvas.configure(xscrollcommand=h_scrollbar.set, yscrollcommand=v_scrollbar.set)
         self.canvas.bind("<ButtonPress-1>", self.scroll_start)
         self.canvas.bind("<B1-Motion>", self.scroll_move)
+        # Shift+drag selects a region to OCR; plain dragging keeps scrolling
+        self.canvas.bind("<Shift-ButtonPress-1>", self.region_start)
+        self.canvas.bind("<Shift-B1-Motion>", self.region_move)
+        self.canvas.bind("<Shift-ButtonRelease-1>", self.region_end)
+        self.canvas.bind("<ButtonRelease-1>", self.region_end)
 
         # Controls for the image
         controls_frame = ttk.Frame(preview_frame)
@@ -160,6 +239,17 @@ class OCRtoWordGUI:
         ttk.Button(rotate_frame, text="↷", width=3, command=self.rotate_cw).pack(side=tk.RIGHT)
         ttk.Button(rotate_frame, text="Reset", command=self.rotate_reset).pack(side=tk.LEFT, padx=5, fill=tk.X,
                                                                                expand=True)
+        ttk.Button(controls_frame, text="Auto Orient", command=self.rotate_auto).pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(controls_frame, text="Regions (Shift+drag):").pack(anchor=tk.W, pady=(0, 5))
+        ttk.Label(controls_frame, textvariable=self.region_info).pack(anchor=tk.W, pady=(0, 5))
+        region_frame = ttk.Frame(controls_frame)
+        region_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Button(region_frame, text="Undo", width=6, command=self.undo_region).pack(side=tk.LEFT)
+        ttk.Button(region_frame, text="Clear", width=6, command=self.clear_regions).pack(side=tk.RIGHT)
+        ttk.Button(controls_frame, text="Save Template...", command=self.save_region_template).pack(fill=tk.X)
+        ttk.Button(controls_frame, text="Load Template...", command=self.load_region_template).pack(fill=tk.X,
+                                                                                                 pady=(5, 10))
 
         # Output section
         output_frame = ttk.LabelFrame(main_frame, text="Word Output", padding="10")
@@ -199,31 +289,50 @@ class OCRtoWordGUI:
         buttons_frame = ttk.Frame(files_frame)
         buttons_frame.pack(fill=tk.X, pady=5)
         ttk.Button(buttons_frame, text="Add Files", command=self.add_batch_files).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons_frame, text="Add Folder", command=self.add_batch_folder).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Remove Selected", command=self.remove_selected_files).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Clear All", command=self.clear_batch_files).pack(side=tk.LEFT, padx=5)
 
+        # Folder filters
+        filter_frame = ttk.Frame(files_frame)
+        filter_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(filter_frame, text="Include:").pack(side=tk.LEFT, padx=5)
+        ttk.Entry(filter_frame, textvariable=self.include_patterns, width=25).pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Exclude:").pack(side=tk.LEFT, padx=5)
+        ttk.Entry(filter_frame, textvariable=self.exclude_patterns, width=25).pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="(globs separated by ;)").pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(filter_frame, text="Show thumbnails", variable=self.show_thumbnails,
+                        command=self.toggle_thumbnails).pack(side=tk.RIGHT, padx=5)
+
         # Files listbox with scrollbar
         list_frame = ttk.Frame(files_frame)
         list_frame.pack(fill=tk.BOTH, expand=True, pady=5)
 
-        self.files_listbox = tk.Listbox(list_frame, selectmode=tk.EXTENDED)
-        self.files_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.files_listbox.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.files_listbox.configure(yscrollcommand=scrollbar.set)
+        # Only the visible rows are drawn, so large queues stay responsive
+        self.thumbnails = ThumbnailCache(on_ready=self.on_thumbnail_ready)
+        self.files_view = VirtualListView(list_frame, self.batch_files, thumbnails=self.thumbnails)
+        self.files_view.pack(fill=tk.BOTH, expand=True)
 
         # Output directory selection
         output_frame = ttk.LabelFrame(batch_frame, text="Batch Output Directory", padding="10")
         output_frame.pack(fill=tk.X, padx=5, pady=5)
 
         self.batch_output_dir = tk.StringVar()
+        self.batch_output_kind = tk.StringVar(value="directory")
         ttk.Entry(output_frame, textvariable=self.batch_output_dir, width=50).pack(side=tk.LEFT, fill=tk.X, expand=True,
                                                                                    padx=5)
         ttk.Button(output_frame, text="Browse...", command=self.browse_output_dir).pack(side=tk.RIGHT, padx=5)
+        kind_combo = ttk.Combobox(output_frame, textvariable=self.batch_output_kind, state="readonly", width=10)
+        kind_combo['values'] = SINK_KINDS
+        kind_combo.pack(side=tk.RIGHT, padx=5)
+        ttk.Label(output_frame, text="Write as:").pack(side=tk.RIGHT)
 
-        # Process batch button
+        # Process batch buttons
         ttk.Button(batch_frame, text="Process Batch", command=self.process_batch).pack(side=tk.RIGHT, pady=10, padx=5)
+        ttk.Button(batch_frame, text="Enqueue for Workers...", command=self.enqueue_batch_for_workers).pack(
+            side=tk.RIGHT, pady=10, padx=5)
+        ttk.Checkbutton(batch_frame, text="Retry quarantined files", variable=self.retry_quarantined).pack(
+            side=tk.LEFT, pady=10, padx=5)
 
     def create_format_tab(self):
         format_frame = ttk.Frame(self.format_tab, padding="10")
@@ -326,6 +435,32 @@ class OCRtoWordGUI:
         threshold_scale.grid(row=1, column=1, sticky=tk.EW, pady=5, padx=5)
         ttk.Label(binary_frame, textvariable=self.threshold).grid(row=1, column=2, padx=5)
 
+        # Orientation controls
+        orientation_frame = ttk.LabelFrame(process_frame, text="Orientation", padding="10")
+        orientation_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        ttk.Checkbutton(orientation_frame, text="Automatically correct orientation (0/90/180/270) and skew",
+                        variable=self.auto_orient).grid(row=0, column=0, sticky=tk.W, pady=5)
+
+        # OCR engine controls
+        engine_frame = ttk.LabelFrame(process_frame, text="OCR Engine", padding="10")
+        engine_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        ttk.Label(engine_frame, text="Profile:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        profile_combo = ttk.Combobox(engine_frame, textvariable=self.ocr_profile, state="readonly", width=12)
+        profile_combo['values'] = profile_names()
+        profile_combo.grid(row=0, column=1, sticky=tk.W, pady=5, padx=5)
+
+        ttk.Checkbutton(engine_frame, text="Sparse text (fast profile only)", variable=self.sparse_text).grid(row=0,
+                                                                                                           column=2,
+                                                                                                           sticky=tk.W,
+                                                                                                           padx=5)
+
+        ttk.Label(engine_frame, text="Models directory:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        ttk.Entry(engine_frame, textvariable=self.models_dir, width=40).grid(row=1, column=1, columnspan=2,
+                                                                             sticky=tk.EW, pady=5, padx=5)
+        ttk.Button(engine_frame, text="Browse...", command=self.browse_models_dir).grid(row=1, column=3, pady=5)
+
         # Apply buttons
         button_frame = ttk.Frame(process_frame)
         button_frame.pack(fill=tk.X, pady=10)
@@ -335,6 +470,44 @@ class OCRtoWordGUI:
         ttk.Button(button_frame, text="Apply to Current Image", command=self.apply_image_processing).pack(side=tk.RIGHT,
                                                                                                           padx=5)
 
+    def create_search_tab(self):
+        search_frame = ttk.Frame(self.search_tab, padding="10")
+        search_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Query section
+        query_frame = ttk.Frame(search_frame)
+        query_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        self.search_query = tk.StringVar()
+        self.search_newest_first = tk.BooleanVar(value=False)
+        ttk.Label(query_frame, text="Find:").pack(side=tk.LEFT, padx=5)
+        query_entry = ttk.Entry(query_frame, textvariable=self.search_query, width=50)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        query_entry.bind("<Return>", self.run_search)
+        ttk.Button(query_frame, text="Search", command=self.run_search).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(query_frame, text="Newest first", variable=self.search_newest_first).pack(side=tk.LEFT,
+                                                                                                 padx=5)
+        ttk.Label(search_frame, text='Words, "exact phrases", prefix* and AND / OR / NOT are supported. '
+                                     'Double-click a result to open its document.').pack(anchor=tk.W, padx=10)
+
+        # Results section
+        results_frame = ttk.Frame(search_frame)
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.search_tree = ttk.Treeview(results_frame, columns=("source", "language", "snippet"), show="headings")
+        self.search_tree.heading("source", text="Image")
+        self.search_tree.heading("language", text="Language")
+        self.search_tree.heading("snippet", text="Text")
+        self.search_tree.column("source", width=220)
+        self.search_tree.column("language", width=70, stretch=False)
+        self.search_tree.column("snippet", width=500)
+        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.search_tree.yview)
+        self.search_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.search_tree.pack(fill=tk.BOTH, expand=True)
+        self.search_tree.bind("<Double-1>", self.open_search_result)
+        self.search_results = {}
+
     def create_status_bar(self):
         status_bar = ttk.Frame(self.root, relief=tk.SUNKEN, padding=(2, 2))
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
@@ -345,13 +518,157 @@ class OCRtoWordGUI:
         self.zoom_info = tk.StringVar(value="Zoom: 100%")
         ttk.Label(status_bar, textvariable=self.zoom_info).pack(side=tk.RIGHT, padx=10)
 
+        # Event loop latency: how long the window last took to respond, and the worst so far
+        self.latency_info = tk.StringVar(value="UI: -")
+        ttk.Label(status_bar, textvariable=self.latency_info).pack(side=tk.RIGHT, padx=10)
+        self.monitor.start()
+
+    def on_latency_update(self, monitor):
+        self.latency_info.set(monitor.describe())
+
+    def toggle_profiling(self, event=None):
+        profiling.set_enabled(not profiling.enabled())
+        if profiling.enabled():
+            self.status_message.set("Profiling on: reports are written next to the output")
+        else:
+            self.status_message.set("Profiling off")
+
+    # Startup methods
+    def start_warm_up(self):
+        # Runs once the window is visible: load heavy modules and check Tesseract in the background
+        threading.Thread(target=self.warm_up_thread, daemon=True).start()
+
+    def warm_up_thread(self):
+        try:
+            ocr_pipeline.warm_up()
+        except ImportError as e:
+            self.root.after(0, lambda msg=str(e): self.status_message.set(f"Missing dependency: {msg}"))
+            return
+
+        info = env_probe.get_environment()
+        self.root.after(0, self.on_environment_ready, info)
+
+    def on_environment_ready(self, info):
+        if info["error"]:
+            self.status_message.set(info["error"])
+            messagebox.showwarning("Tesseract", info["error"])
+            return
+
+        # Only offer languages that are actually installed
+        installed = set(info["languages"])
+        available = [name for name, code in self.languages.items() if code in installed]
+        if available:
+            self.language_combo['values'] = available
+            if self.language.get() not in installed:
+                self.language_combo.set(available[0])
+                self.language.set(self.languages[available[0]])
+
+        self.status_message.set(f"Ready - Tesseract {info['version']}, {len(installed)} languages installed")
+
     # Image preview interaction methods
     def scroll_start(self, event):
         self.canvas.scan_mark(event.x, event.y)
 
     def scroll_move(self, event):
+        # Shift released mid-selection: keep selecting rather than scroll
+        if self.region_drag_start:
+            self.region_move(event)
+            return
         self.canvas.scan_dragto(event.x, event.y, gain=1)
 
+    # Region selection methods
+    def region_start(self, event):
+        if not self.original_image:
+            return
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        self.region_drag_start = (x, y)
+        self.canvas.create_rectangle(x, y, x, y, outline="red", dash=(4, 2), tags="rubber_band")
+
+    def region_move(self, event):
+        if self.region_drag_start:
+            x0, y0 = self.region_drag_start
+            self.canvas.coords("rubber_band", x0, y0, self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+
+    def region_end(self, event):
+        if not self.region_drag_start:
+            return
+        x0, y0 = self.region_drag_start
+        x1, y1 = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        self.region_drag_start = None
+        self.canvas.delete("rubber_band")
+
+        # A click, or a drag of a few pixels, is not a selection
+        if abs(x1 - x0) < 5 or abs(y1 - y0) < 5:
+            return
+        box = box_from_preview(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1), self.preview_scale,
+                               self.rotation_angle, self.original_image.size, self.preview_source_size)
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return  # Entirely outside the image
+        self.regions.append((f"Region {len(self.regions) + 1}", box))
+        self.regions_changed()
+
+    def undo_region(self):
+        if self.regions:
+            self.regions.pop()
+            self.regions_changed()
+
+    def clear_regions(self):
+        self.regions = []
+        self.regions_changed()
+
+    def regions_changed(self):
+        self.region_info.set(f"{len(self.regions)} region(s)" if self.regions else "Whole page")
+        self.draw_regions()
+        self.schedule_speculation()
+
+    def draw_regions(self):
+        # Regions are kept relative to the image file and redrawn for the current zoom and rotation
+        self.canvas.delete("region")
+        if not self.original_image or not self.preview_source_size:
+            return
+        for label, box in self.regions:
+            x0, y0, x1, y1 = box_to_preview(box, self.preview_scale, self.rotation_angle,
+                                            self.original_image.size, self.preview_source_size)
+            self.canvas.create_rectangle(x0, y0, x1, y1, outline="red", width=2, tags="region")
+            self.canvas.create_text(x0 + 3, y0 + 3, text=label, anchor=tk.NW, fill="red", tags="region")
+
+    def save_region_template(self):
+        if not self.regions:
+            messagebox.showerror("Error", "No regions selected. Shift+drag on the preview to select some.")
+            return
+
+        template_dir = os.path.join(env_probe.cache_dir(), "templates")
+        os.makedirs(template_dir, exist_ok=True)
+        filename = filedialog.asksaveasfilename(
+            title='Save region template',
+            initialdir=template_dir,
+            defaultextension=".json",
+            filetypes=(('Region templates', '*.json'), ('All files', '*.*'))
+        )
+
+        if filename:
+            try:
+                save_template(filename, self.regions)
+                self.status_message.set(f"Region template saved to {os.path.basename(filename)}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save region template: {str(e)}")
+
+    def load_region_template(self):
+        filename = filedialog.askopenfilename(
+            title='Load region template',
+            initialdir=os.path.join(env_probe.cache_dir(), "templates"),
+            filetypes=(('Region templates', '*.json'), ('All files', '*.*'))
+        )
+
+        if filename:
+            try:
+                self.regions = list(load_template(filename))
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load region template: {str(e)}")
+                return
+            self.regions_changed()
+            self.status_message.set(f"Loaded {len(self.regions)} region(s) from {os.path.basename(filename)}")
+
     def zoom_in(self):
         self.preview_scale *= 1.25
         self.update_preview()
@@ -393,16 +710,40 @@ class OCRtoWordGUI:
         self.rotation_angle = 0
         self.update_preview()
 
+    def rotate_auto(self):
+        if not self.original_image:
+            messagebox.showerror("Error", "No image loaded. Please load an image first.")
+            return
+
+        self.status_message.set("Detecting orientation...")
+        threading.Thread(target=self.detect_orientation_thread, args=(self.original_image,), daemon=True).start()
+
+    def detect_orientation_thread(self, image):
+        try:
+            orientation = detect_orientation(image)
+            self.root.after(0, self.apply_detected_orientation, orientation)
+        except Exception as e:
+            self.root.after(0, lambda msg=str(e): self.status_message.set(f"Orientation detection failed: {msg}"))
+
+    def apply_detected_orientation(self, orientation):
+        # The preview rotates clockwise by rotation_angle, which may include the fine skew
+        self.rotation_angle = (orientation["rotation"] + orientation["skew"]) % 360
+        self.update_preview()
+        self.status_message.set(f"Detected rotation {orientation['rotation']}°, skew {orientation['skew']:.1f}° "
+                                f"({orientation['method']})")
+
     def update_preview(self):
         if self.original_image:
-            # Rotate image if needed
+            from PIL import Image, ImageTk
+
+            # Rotate image if needed (the original may be shared with the image store, so it is never changed)
             if self.rotation_angle != 0:
                 img = self.original_image.rotate(-self.rotation_angle, expand=True)
             else:
-                img = self.original_image.copy()
+                img = self.original_image
 
             # Calculate new size
-            width, height = img.size
+            width, height = self.preview_source_size = img.size
             new_width = int(width * self.preview_scale)
             new_height = int(height * self.preview_scale)
 
@@ -419,6 +760,7 @@ class OCRtoWordGUI:
             self.canvas.delete("all")
             self.canvas.configure(scrollregion=(0, 0, new_width, new_height))
             self.canvas.create_image(0, 0, image=self.preview_image, anchor=tk.NW)
+            self.draw_regions()
 
     # File and directory browsing methods
     def browse_input_image(self):
@@ -442,8 +784,13 @@ class OCRtoWordGUI:
 
     def load_image(self, image_path):
         try:
-            # Open the image and store original
-            self.original_image = Image.open(image_path)
+            # Decoded once and kept in the shared image store, so going back to an image is instant
+            store = get_store()
+            cached = store.cached(image_path)
+            self.original_image = store.get(image_path)
+            self.loaded_image_path = image_path
+
+            self.image_modified = False
 
             # Reset zoom and rotation
             self.preview_scale = 1.0
@@ -453,7 +800,10 @@ class OCRtoWordGUI:
             self.update_preview()
             self.zoom_fit()  # Auto fit the image
 
-            self.status_message.set(f"Loaded image: {os.path.basename(image_path)}")
+            self.status_message.set(f"Loaded image: {os.path.basename(image_path)}" + (" (cached)" if cached else ""))
+
+            # Start reading it now, before the user asks for the text
+            self.start_speculation()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load image: {str(e)}")
             self.status_message.set("Error loading image")
@@ -481,10 +831,18 @@ class OCRtoWordGUI:
         if directory:
             self.batch_output_dir.set(directory)
 
+    def browse_models_dir(self):
+        directory = filedialog.askdirectory(
+            title='Select directory containing tessdata_fast / tessdata_best'
+        )
+
+        if directory:
+            self.models_dir.set(directory)
+
     # Batch processing methods
     def add_batch_files(self):
         filetypes = (
-            ('Image files', '*.png *.jpg *.jpeg *.bmp *.tiff *.tif'),
+            ('Image files', ' '.join(f'*{ext}' for ext in IMAGE_EXTENSIONS)),
             ('All files', '*.*')
         )
         filenames = filedialog.askopenfilenames(
@@ -494,34 +852,98 @@ class OCRtoWordGUI:
         )
 
         if filenames:
-            for file in filenames:
-                if file not in self.batch_files:
-                    self.batch_files.append(file)
-                    self.files_listbox.insert(tk.END, os.path.basename(file))
+            added = self.batch_files.add_many(filenames)
+            self.files_view.refresh()
+
+            self.status_message.set(f"Added {added} files to batch queue")
+
+    def add_batch_folder(self):
+        directory = filedialog.askdirectory(title='Select a folder of images for batch processing')
+        if not directory:
+            return
 
-            self.status_message.set(f"Added {len(filenames)} files to batch queue")
+        include = split_patterns(self.include_patterns.get())
+        exclude = split_patterns(self.exclude_patterns.get())
+
+        # Walk the folder in the background and feed the queue as files are found
+        self.ingest_count += 1
+        self.status_message.set(f"Scanning {directory}...")
+        self.poll_ingest_view()
+        threading.Thread(target=self.ingest_folder_thread, args=(directory, include, exclude), daemon=True).start()
+
+    def ingest_folder_thread(self, directory, include, exclude):
+        added = 0
+        try:
+            for chunk in iter_chunks(iter_image_files(directory, include, exclude), 500):
+                added += self.batch_files.add_many(chunk, source_root=directory)
+                self.root.after(0, lambda n=added: self.status_message.set(f"Scanning {directory}: {n} files added"))
+        finally:
+            self.root.after(0, self.ingest_complete, directory, added)
+
+    def ingest_complete(self, directory, added):
+        self.ingest_count -= 1
+        self.files_view.refresh()
+        self.status_message.set(f"Added {added} files from {directory}")
+
+    def poll_ingest_view(self):
+        self.files_view.refresh()
+        if self.ingest_count:
+            self.root.after(250, self.poll_ingest_view)
+
+    def toggle_thumbnails(self):
+        self.files_view.set_thumbnails(self.thumbnails if self.show_thumbnails.get() else None)
+
+    def on_thumbnail_ready(self):
+        # Called from the thumbnail thread; coalesce into one redraw
+        if not self.thumbnail_refresh_pending:
+            self.thumbnail_refresh_pending = True
+            self.root.after(100, self.refresh_thumbnails)
+
+    def refresh_thumbnails(self):
+        self.thumbnail_refresh_pending = False
+        self.files_view.refresh(force=True)
 
     def remove_selected_files(self):
-        selected_indices = self.files_listbox.curselection()
+        selected_indices = self.files_view.curselection()
         if not selected_indices:
             return
 
-        # Convert to list and sort in reverse order to avoid index issues when deleting
-        indices = sorted(list(selected_indices), reverse=True)
+        removed = self.batch_files.remove_indices(selected_indices)
+        self.files_view.clear_selection()
+        self.files_view.refresh()
 
-        for i in indices:
-            del self.batch_files[i]
-            self.files_listbox.delete(i)
-
-        self.status_message.set(f"Removed {len(indices)} files from batch queue")
+        self.status_message.set(f"Removed {removed} files from batch queue")
 
     def clear_batch_files(self):
         self.batch_files.clear()
-        self.files_listbox.delete(0, tk.END)
+        self.files_view.clear_selection()
+        self.files_view.refresh()
         self.status_message.set("Cleared batch queue")
 
+    def poll_batch_view(self, spec, progress):
+        # Redraw the visible rows while a batch runs so per-item status shows up inline,
+        # and apply everything the workers reported since the last tick in one go
+        self.files_view.refresh()
+        if progress.drain():
+            total = len(self.batch_files)
+            self.progress_bar.configure(maximum=max(1, total), value=progress.completed)
+            if progress.last_name:
+                self.status_message.set(f"{progress.describe(total)}: {progress.last_name}")
+
+        if progress.result is None:
+            self.root.after(250, self.poll_batch_view, spec, progress)
+        elif "error" in progress.result:
+            self.batch_process_failed(progress.result["error"])
+        else:
+            self.batch_process_complete(spec, progress)
+
     def process_batch(self):
-        if not self.batch_files:
+        # A second batch would reset and claim from the same queue as the running one
+        if self.batch_running:
+            messagebox.showerror("Error", "A batch is already running. Please wait for it to finish.")
+            return
+
+        if not self.batch_files and not self.ingest_count:
             messagebox.showerror("Error", "Batch queue is empty. Please add files first.")
             return
 
@@ -529,55 +951,161 @@ class OCRtoWordGUI:
             messagebox.showerror("Error", "Please select an output directory for batch processing.")
             return
 
+        # Files still arriving from a folder ingest are processed with the same spec
+        spec = self.make_job_spec("batch", self.batch_files.paths(), self.batch_output_dir.get(),
+                                  self.batch_output_kind.get())
+
         # Start batch processing in a separate thread
-        self.progress_bar.start()
+        progress = ProgressChannel()
+        self.batch_files.reset_status()
+        self.batch_running = True
+        self.progress_bar.configure(mode='determinate', maximum=max(1, len(self.batch_files)), value=0)
         self.status_message.set("Processing batch...")
-        threading.Thread(target=self.batch_process_thread, daemon=True).start()
+        threading.Thread(target=self.batch_process_thread, args=(spec, progress, self.retry_quarantined.get()),
+                         daemon=True).start()
+        self.poll_batch_view(spec, progress)
 
-    def batch_process_thread(self):
+    def batch_process_thread(self, spec, progress, retry_quarantined=False):
+        # Runs off the Tk thread: everything the UI needs goes through the progress channel
         success_count = 0
         fail_count = 0
-        total_files = len(self.batch_files)
-
-        try:
-            for i, image_path in enumerate(self.batch_files):
-                try:
-                    # Update status on main thread
-                    self.root.after(0, lambda: self.status_message.set(
-                        f"Processing file {i + 1} of {total_files}: {os.path.basename(image_path)}"))
+        languages = Counter()
+        logger.info("Starting %s", spec.describe())
 
-                    # Load and process the image
-                    image = Image.open(image_path)
+        # Run as many pages in parallel as the CPU budget allows
+        plan = get_budget().plan("batch")
+        settings = spec.settings
 
-                    # Apply image processing
-                    processed_image = self.process_image_with_settings(image)
+        # Pages are OCR'd in supervised worker processes, so one that hangs or
+        # eats all memory is killed and quarantined instead of stalling the batch
+        quarantine = Quarantine()
+        pool = WorkerPool(plan.workers, quarantine=quarantine)
+        # Files waiting for a worker are read ahead while earlier ones are OCR'd
+        prefetcher = Prefetcher()
+        sink = None
 
-                    # Perform OCR
-                    text = pytesseract.image_to_string(processed_image, lang=self.language.get())
+        try:
+            with profiling.job(spec.output, "batch") as profiler:
+                # Documents are written by the sink's own thread, as files or into one archive
+                sink = make_sink(spec.output_kind, spec.output)
+                with ThreadPoolExecutor(max_workers=plan.workers) as executor:
+                    running = {}
+                    while True:
+                        # Keep the workers fed from the queue, which may still be growing
+                        # while a folder is being ingested
+                        while len(running) < plan.workers * 2:
+                            item = self.batch_files.claim_next()
+                            if item is None:
+                                break
+                            reason = quarantine.reason(item.path)
+                            if reason and not retry_quarantined:
+                                fail_count += 1
+                                self.batch_files.set_status(item.path, FAILED, error=f"quarantined: {reason}")
+                                progress.item_failed(item.name, f"quarantined: {reason}")
+                                continue
+                            future = executor.submit(profiler.run, self.batch_process_file, item, sink, settings,
+                                                     spec.job_id, pool)
+                            running[future] = item
+                            prefetcher.submit(item.path)
+
+                        if not running:
+                            if self.ingest_count == 0:
+                                break
+                            time.sleep(0.2)
+                            continue
+
+                        finished, _ = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            item = running.pop(future)
+                            try:
+                                details = future.result()
+                                success_count += 1
+                                languages[details.get("language", settings["language"])] += 1
+                                progress.item_done(item.name)
+                            except Exception as e:
+                                fail_count += 1
+                                progress.item_failed(item.name, str(e))
+
+                # Wait for the remaining writes; failed writes count as failed files
+                with profiling.stage("flush"):
+                    write_errors = sink.close()
+                for source_path, msg in write_errors:
+                    if source_path:
+                        # Already counted as converted when OCR finished
+                        success_count -= 1
+                        self.batch_files.set_status(source_path, FAILED, error=f"write failed: {msg}")
+                    fail_count += 1
+                    progress.error(os.path.basename(source_path or sink.location), f"write failed: {msg}")
 
-                    # Generate output filename
-                    base_name = os.path.splitext(os.path.basename(image_path))[0]
-                    output_file = os.path.join(self.batch_output_dir.get(), f"{base_name}.docx")
+            if pool.restarts:
+                logger.warning("%d OCR worker(s) were restarted", pool.restarts)
+            logger.info("Pages per language: %s", dict(languages))
+            progress.finish(success=success_count, failed=fail_count, languages=languages)
 
-                    # Create Word document
-                    doc = self.create_word_document(text)
+        except Exception as e:
+            progress.finish(error=str(e))
+        finally:
+            # If the batch is cut short, what was submitted is still written out
+            if sink is not None:
+                sink.close()
+            prefetcher.close()
+            pool.close()
+
+    def batch_process_file(self, item, sink, settings, job_id, pool):
+        start = time.perf_counter()
+        try:
+            # Generate output name, mirroring the input tree for folder ingests
+            output_name = ocr_pipeline.output_relpath_for(item.path, item.source_root)
+
+            # Load, process and OCR the image in a worker process
+            details = {}
+            with profiling.stage("worker"):
+                text = pool.extract_text_from_file(item.path, settings, details)
+
+            # Hand the document to the sink, which saves it in the background
+            # and indexes it once it is written
+            def index(written_name):
+                ocr_pipeline.index_text(item.path, sink.output_location(written_name), text, settings, details)
+
+            with profiling.stage("document"):
+                doc = ocr_pipeline.create_word_document(text, settings)
+            with profiling.stage("submit"):
+                sink.submit(doc, output_name, item.path, on_written=profiling.carry(index), job=job_id,
+                            duration=time.perf_counter() - start, **details)
+        except Exception as e:
+            self.batch_files.set_status(item.path, FAILED, time.perf_counter() - start, str(e))
+            raise
+        self.batch_files.set_status(item.path, DONE, time.perf_counter() - start)
+        return details
 
-                    # Save document
-                    doc.save(output_file)
-                    success_count += 1
+    def enqueue_batch_for_workers(self):
+        if not self.batch_files:
+            messagebox.showerror("Error", "Batch queue is empty. Please add files first.")
+            return
 
-                except Exception as e:
-                    fail_count += 1
-                    self.root.after(0, lambda msg=str(e): messagebox.showerror("Error",
-                                                                               f"Failed to process {os.path.basename(image_path)}: {msg}"))
+        if not self.batch_output_dir.get():
+            messagebox.showerror("Error", "Please select an output directory for batch processing.")
+            return
 
-            # Complete
-            self.root.after(0, self.batch_process_complete, success_count, fail_count)
+        queue_dir = filedialog.askdirectory(title='Select shared work queue directory')
+        if not queue_dir:
+            return
 
+        try:
+            queue = WorkQueue(queue_dir)
+            spec = self.make_job_spec("queue", self.batch_files.paths(), self.batch_output_dir.get())
+            queue.record_job(spec.to_dict())
+            settings = spec.settings
+            for item in self.batch_files:
+                output_file = ocr_pipeline.output_path_for(item.path, spec.output, item.source_root)
+                queue.enqueue(item.path, output_file, settings, spec.job_id)
+
+            self.status_message.set(f"Enqueued {len(self.batch_files)} files in {queue_dir}")
+            messagebox.showinfo("Enqueued", f"Enqueued {len(self.batch_files)} files.\n\n"
+                                            f"Start workers on any machine that mounts the queue with:\n"
+                                            f"python ocr_cli.py worker \"{queue_dir}\"")
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Batch processing failed: {str(e)}"))
-            self.root.after(0, lambda: self.progress_bar.stop())
-            self.root.after(0, lambda: self.status_message.set("Batch processing failed"))
+            messagebox.showerror("Error", f"Failed to enqueue batch: {str(e)}")
 
     # def batch_process_complete(self, success_count, fail_count):
     #     self.progress_bar.stop()
@@ -585,16 +1113,95 @@ class OCRtoWordGUI:
     #     self.status_message.set(message)
     #     messagebox.showinfo("Batch Complete",
 
-    def batch_process_complete(self, success_count, fail_count):
-        self.progress_bar.stop()
-        message = f"Batch processing complete. Success: {success_count}, Failed: {fail_count}"
+    def finish_batch_progress(self):
+        self.batch_running = False
+        self.files_view.refresh()
+        self.progress_bar.configure(mode='indeterminate', value=0)
+
+    def batch_process_failed(self, message):
+        self.finish_batch_progress()
+        self.status_message.set("Batch processing failed")
+        messagebox.showerror("Error", f"Batch processing failed: {message}")
+
+    def batch_process_complete(self, spec, progress):
+        self.finish_batch_progress()
+        success_count = progress.result["success"]
+        fail_count = progress.result["failed"]
+        elapsed = time.monotonic() - progress.started_at
+        message = (f"Batch processing complete. Success: {success_count}, Failed: {fail_count} "
+                   f"in {elapsed:.0f}s (OCR profile: {spec.settings['ocr_profile']})")
         self.status_message.set(message)
-        messagebox.showinfo("Batch Complete", message)
+        if spec.settings["detect_language"]:
+            message += "\nLanguages: " + ", ".join(f"{lang} {count}"
+                                                   for lang, count in progress.result["languages"].most_common())
+
+        # One report for all failures rather than a dialog per file
+        if progress.errors:
+            self.show_error_report(message, progress.error_report())
+        else:
+            messagebox.showinfo("Batch Complete", message)
 
         # Ask if user wants to open the output directory
         if success_count > 0 and messagebox.askyesno("Open Directory",
                                                      "Would you like to open the output directory?"):
-            self.open_directory(self.batch_output_dir.get())
+            self.open_directory(spec.output)
+
+    def show_error_report(self, summary, report):
+        window = tk.Toplevel(self.root)
+        window.title("Batch Errors")
+        window.geometry("700x400")
+
+        ttk.Label(window, text=summary, padding=(10, 5)).pack(fill=tk.X)
+
+        control_frame = ttk.Frame(window)
+        control_frame.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Button(control_frame, text="Copy to Clipboard",
+                   command=lambda: self.copy_to_clipboard(report)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Save Report",
+                   command=lambda: self.save_text_to_file(report)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Close", command=window.destroy).pack(side=tk.RIGHT, padx=5)
+
+        text_area = scrolledtext.ScrolledText(window, wrap=tk.NONE, width=80, height=20)
+        text_area.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        text_area.insert("1.0", report)
+        text_area.configure(state=tk.DISABLED)
+        window.lift()
+
+    # Search methods
+    def run_search(self, event=None):
+        query = self.search_query.get().strip()
+        if not query:
+            return
+        order = "recent" if self.search_newest_first.get() else "rank"
+        self.status_message.set(f"Searching for {query}...")
+        threading.Thread(target=self.search_thread, args=(query, order), daemon=True).start()
+
+    def search_thread(self, query, order):
+        try:
+            results = get_index().search(query, limit=200, order=order)
+            self.root.after(0, self.show_search_results, query, results)
+        except Exception as e:
+            self.root.after(0, lambda msg=str(e): self.status_message.set(f"Search failed: {msg}"))
+
+    def show_search_results(self, query, results):
+        self.search_tree.delete(*self.search_tree.get_children())
+        self.search_results = {}
+        for result in results:
+            iid = self.search_tree.insert("", tk.END, values=(os.path.basename(result.source), result.language or "",
+                                                              " ".join(result.snippet.split())))
+            self.search_results[iid] = result
+        self.status_message.set(f"{len(results)} pages match {query}")
+
+    def open_search_result(self, event=None):
+        selection = self.search_tree.selection()
+        if not selection:
+            return
+        result = self.search_results[selection[0]]
+        if result.output and os.path.isfile(result.output):
+            self.open_document(result.output)
+        else:
+            # Documents written into an archive have no file of their own
+            messagebox.showinfo("Search Result", f"Image: {result.source}\nDocument: {result.output}")
 
     def open_directory(self, dir_path):
         try:
@@ -630,38 +1237,96 @@ class OCRtoWordGUI:
 
             # Update the display
             self.original_image = processed_image
+            self.image_modified = True
             self.update_preview()
 
+            # Jobs now OCR the image in memory, not the file the background run reads
+            self.speculator.cancel()
+
             self.status_message.set("Image processing applied")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to apply image processing: {str(e)}")
 
-    def process_image_with_settings(self, image):
-        img = image.copy()
-
-        # Apply brightness adjustment
-        if self.brightness.get() != 1.0:
-            enhancer = ImageEnhance.Brightness(img)
-            img = enhancer.enhance(self.brightness.get())
-
-        # Apply contrast adjustment
-        if self.contrast.get() != 1.0:
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(self.contrast.get())
-
-        # Apply sharpness adjustment
-        if self.sharpen.get() != 1.0:
-            enhancer = ImageEnhance.Sharpness(img)
-            img = enhancer.enhance(self.sharpen.get())
-
-        # Apply binarization (convert to black and white)
-        if self.binarize.get():
-            # Convert to grayscale first
-            img = img.convert('L')
-            # Apply threshold
-            img = img.point(lambda x: 0 if x < self.threshold.get() else 255, '1')
+    def snapshot_settings(self):
+        # Capture every setting the OCR pipeline needs as a plain dict
+        return ocr_pipeline.merge_settings({
+            "language": self.language.get(),
+            "detect_language": self.detect_language.get(),
+            "allowed_languages": self.allowed_languages.get(),
+            "ocr_profile": self.ocr_profile.get(),
+            "models_dir": self.models_dir.get(),
+            "sparse_text": self.sparse_text.get(),
+            "brightness": self.brightness.get(),
+            "contrast": self.contrast.get(),
+            "sharpen": self.sharpen.get(),
+            "binarize": self.binarize.get(),
+            "threshold": self.threshold.get(),
+            "auto_orient": self.auto_orient.get(),
+            "regions": tuple(self.regions),
+            "font_family": self.font_family.get(),
+            "font_size": self.font_size.get(),
+            "alignment": self.alignment.get(),
+            "include_title": self.include_title.get(),
+            "title_text": self.title_text.get(),
+        })
+
+    def make_job_spec(self, kind, inputs=(), output="", output_kind="directory"):
+        # Tk thread only: reads every Tk variable once; worker threads get the frozen result
+        return JobSpec.create(kind, self.snapshot_settings(), inputs, output, output_kind)
+
+    # Speculative OCR methods
+    def schedule_speculation(self, *args):
+        if self.speculation_pending:
+            self.root.after_cancel(self.speculation_pending)
+        self.speculation_pending = self.root.after(SPECULATION_DELAY_MS, self.start_speculation)
+
+    def start_speculation(self):
+        self.speculation_pending = None
+        # Processing applied to the preview means jobs OCR the image in memory instead
+        if not self.loaded_image_path or self.image_modified:
+            self.speculator.cancel()
+            return
+        try:
+            spec = self.make_job_spec("extract", (self.loaded_image_path,))
+        except tk.TclError:
+            # A half-typed number in one of the fields; try again after the next change
+            self.speculator.cancel()
+            return
+        # Starting the same text again is a no-op; anything else cancels the previous run
+        self.speculator.start(spec.text_key(self.loaded_image_path), self.loaded_image_path, spec.settings)
+
+    def speculated_result(self, spec):
+        # Tk thread: the background run for this job's text, if there is one
+        path = spec.inputs[0]
+        if self.image_modified or path != self.loaded_image_path:
+            return None
+        try:
+            return self.speculator.result(spec.text_key(path))
+        except OSError:
+            return None
+
+    def wait_for_speculation(self, future):
+        # Worker thread: (text, details) from the background run, waiting for it
+        # if it is still going; None if there is none or it failed or was cancelled
+        if future is None:
+            return None
+        # The run is low priority; with the user waiting, race a normal-priority one against it
+        self.speculator.hurry(future)
+        try:
+            result = future.result()
+        except CancelledError:
+            logger.info("Background OCR not used: cancelled")
+            return None
+        except Exception as e:
+            logger.info("Background OCR not used: %s", e)
+            return None
+        logger.info("Using background OCR result")
+        return result
 
-        return img
+    def process_image_with_settings(self, image):
+        # An unmodified image is the loaded file, so its processed variant can be cached
+        source = None if self.image_modified else self.loaded_image_path
+        return ocr_pipeline.processed_image_for(image, self.snapshot_settings(), source)
 
     def reset_image_processing(self):
         # Reset all image processing values to defaults
@@ -684,23 +1349,31 @@ class OCRtoWordGUI:
             messagebox.showerror("Error", "No image loaded. Please load an image first.")
             return
 
+        spec = self.make_job_spec("extract", (self.input_image_path.get(),))
+        # Processing was applied to the preview, so OCR the in-memory image
+        image = self.original_image if self.image_modified else None
+
         self.progress_bar.start()
         self.status_message.set("Extracting text...")
-        threading.Thread(target=self.extract_text_thread, daemon=True).start()
+        threading.Thread(target=self.extract_text_thread, args=(spec, image, self.speculated_result(spec)),
+                         daemon=True).start()
 
-    def extract_text_thread(self):
+    def extract_text_thread(self, spec, image=None, speculated=None):
         try:
-            # Process the image
-            processed_image = self.process_image_with_settings(self.original_image)
-
-            # Perform OCR
-            text = pytesseract.image_to_string(processed_image, lang=self.language.get())
+            result = self.wait_for_speculation(speculated)
+            if result is not None:
+                text = result[0]
+            elif image is not None:
+                text = ocr_pipeline.extract_text(image, spec.settings)
+            else:
+                # Let Tesseract read the file itself when nothing needs changing
+                text = ocr_pipeline.extract_text_from_file(spec.inputs[0], spec.settings)
 
             # Show text in preview window
             self.root.after(0, lambda: self.show_text_preview(text))
 
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to extract text: {str(e)}"))
+            self.root.after(0, lambda msg=str(e): messagebox.showerror("Error", f"Failed to extract text: {msg}"))
             self.root.after(0, lambda: self.progress_bar.stop())
             self.root.after(0, lambda: self.status_message.set("Text extraction failed"))
 
@@ -793,71 +1466,44 @@ class OCRtoWordGUI:
             messagebox.showerror("Error", "Please specify an output document path.")
             return
 
+        spec = self.make_job_spec("single", (self.input_image_path.get(),), self.output_doc_path.get())
+
         # Start processing in a separate thread
         self.progress_bar.start()
         self.status_message.set("Processing...")
-        threading.Thread(target=self.ocr_to_word_thread, daemon=True).start()
+        threading.Thread(target=self.ocr_to_word_thread, args=(spec, self.speculated_result(spec)),
+                         daemon=True).start()
 
-    def ocr_to_word_thread(self):
+    def ocr_to_word_thread(self, spec, speculated=None):
         try:
-            image_path = self.input_image_path.get()
-            output_file = self.output_doc_path.get()
-
-            # Load the image
-            image = Image.open(image_path)
-
-            # Apply image processing
-            processed_image = self.process_image_with_settings(image)
-
-            # Extract text using pytesseract OCR
-            text = pytesseract.image_to_string(processed_image, lang=self.language.get())
-
-            # Create a Word document
-            doc = self.create_word_document(text)
-
-            # Save the document
-            doc.save(output_file)
+            image_path = spec.inputs[0]
+            output_file = spec.output
+            logger.info("Starting %s", spec.describe())
+
+            # The text may already have been read in the background
+            details = {}
+            text = None
+            result = self.wait_for_speculation(speculated)
+            if result is not None:
+                text, page_details = result
+                details.update(page_details)
+
+            # Load, process and OCR the image, then create and save the Word document
+            with profiling.job(os.path.dirname(os.path.abspath(output_file)), "single") as profiler:
+                profiler.run(ocr_pipeline.convert_file, image_path, output_file, spec.settings, details, text)
+
+            message = (f"Document successfully created: {os.path.basename(output_file)} "
+                       f"(OCR profile: {spec.settings['ocr_profile']})")
+            if "orientation" in details:
+                message += (f", rotated {details['orientation']['rotation']}° "
+                            f"and deskewed {details['orientation']['skew']:.1f}°")
 
             # Update UI on the main thread
-            self.root.after(0, self.process_complete, True,
-                            f"Document successfully created: {os.path.basename(output_file)}")
+            self.root.after(0, self.process_complete, True, message)
 
         except Exception as e:
             self.root.after(0, self.process_complete, False, str(e))
 
-    def create_word_document(self, text):
-        # Create a new Word document
-        doc = Document()
-
-        # Apply document title if enabled
-        if self.include_title.get():
-            doc.add_heading(self.title_text.get(), 0)
-
-        # Get paragraph alignment
-        align_map = {
-            "Left": WD_PARAGRAPH_ALIGNMENT.LEFT,
-            "Center": WD_PARAGRAPH_ALIGNMENT.CENTER,
-            "Right": WD_PARAGRAPH_ALIGNMENT.RIGHT,
-            "Justify": WD_PARAGRAPH_ALIGNMENT.JUSTIFY
-        }
-        alignment = align_map.get(self.alignment.get(), WD_PARAGRAPH_ALIGNMENT.LEFT)
-
-        # Process the text content
-        paragraphs = text.split('\n\n')
-        for para in paragraphs:
-            if para.strip():
-                p = doc.add_paragraph(para.strip())
-
-                # Apply paragraph formatting
-                p.alignment = alignment
-
-                # Apply character formatting to runs
-                for run in p.runs:
-                    run.font.name = self.font_family.get()
-                    run.font.size = Pt(self.font_size.get())
-
-        return doc
-
     def process_complete(self, success, message):
         self.progress_bar.stop()
 
@@ -887,9 +1533,15 @@ class OCRtoWordGUI:
             messagebox.showerror("Error", f"Could not open document: {str(e)}")
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     root = tk.Tk()
     app = OCRtoWordGUI(root)
+    root.after_idle(app.start_warm_up)
     root.mainloop()
+    # Stops a background OCR still running, Tesseract included
+    app.speculator.close()
+    app.monitor.uninstall()
+    logger.info(app.monitor.report())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Shared-filesystem work queue. Every state is a directory and every state
+# change is a rename, which is atomic on local filesystems and on NFS/SMB
+# servers, so any number of workers on any number of hosts can share it.
+#
+#   queue_dir/pending/<id>.json   waiting to be claimed
+#   queue_dir/leases/<id>.json    claimed; the file mtime is the lease heartbeat
+#   queue_dir/done/<id>.json      finished, with status details
+#   queue_dir/failed/<id>.json    failed, with the error
+#   queue_dir/jobs/<job>.json     journal: the job spec each item was enqueued under
+#   queue_dir/tmp/                staging area for atomic writes
+STATES = ("pending", "leases", "done", "failed")
+
+DEFAULT_LEASE_SECONDS = 300
+
+
+def _write_json_atomic(path, data, tmp_dir):
+    tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class WorkQueue:
+    def __init__(self, queue_dir, lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.queue_dir = queue_dir
+        self.lease_seconds = lease_seconds
+        for state in STATES + ("jobs", "tmp"):
+            os.makedirs(os.path.join(queue_dir, state), exist_ok=True)
+
+    def _path(self, state, item_id):
+        return os.path.join(self.queue_dir, state, f"{item_id}.json")
+
+    def _ids(self, state):
+        return sorted(name[:-5] for name in os.listdir(os.path.join(self.queue_dir, state))
+                      if name.endswith(".json"))
+
+    # Coordinator side
+    def record_job(self, job):
+        # job is a JobSpec.to_dict(); items enqueued under it refer to it by id
+        _write_json_atomic(os.path.join(self.queue_dir, "jobs", f"{job['job_id']}.json"), job,
+                           os.path.join(self.queue_dir, "tmp"))
+
+    def enqueue(self, image_path, output_file, settings, job_id=None):
+        # Ids sort by enqueue time so workers take items roughly in order
+        item_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        item = {
+            "id": item_id,
+            "path": os.path.abspath(image_path),
+            "output": os.path.abspath(output_file),
+            "settings": settings,
+            "language": settings.get("language"),
+            "job": job_id,
+            "enqueued_at": time.time(),
+        }
+        _write_json_atomic(self._path("pending", item_id), item, os.path.join(self.queue_dir, "tmp"))
+        return item_id
+
+    def status(self):
+        return {state: len(self._ids(state)) for state in STATES}
+
+    def reclaim_expired(self):
+        # Put items whose worker stopped renewing the lease back in the queue
+        reclaimed = 0
+        now = time.time()
+        for item_id in self._ids("leases"):
+            lease_path = self._path("leases", item_id)
+            try:
+                expired = now - os.path.getmtime(lease_path) > self.lease_seconds
+                if expired:
+                    os.rename(lease_path, self._path("pending", item_id))
+                    reclaimed += 1
+                    logger.warning("Reclaimed expired lease for %s", item_id)
+            except FileNotFoundError:
+                # Finished or reclaimed by someone else in the meantime
+                continue
+        return reclaimed
+
+    # Worker side
+    def claim(self):
+        for item_id in self._ids("pending"):
+            pending_path = self._path("pending", item_id)
+            lease_path = self._path("leases", item_id)
+            try:
+                # Refresh the mtime first so the new lease can't look expired
+                os.utime(pending_path)
+                os.rename(pending_path, lease_path)
+            except FileNotFoundError:
+                # Another worker won the race for this item
+                continue
+            return _read_json(lease_path)
+        return None
+
+    def renew(self, item_id):
+        try:
+            os.utime(self._path("leases", item_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, item, **details):
+        self._finish(item, "done", details)
+
+    def fail(self, item, error, **details):
+        details["error"] = error
+        self._finish(item, "failed", details)
+
+    def _finish(self, item, state, details):
+        record = dict(item)
+        record.update(details)
+        record["finished_at"] = time.time()
+        _write_json_atomic(self._path(state, item["id"]), record, os.path.join(self.queue_dir, "tmp"))
+        try:
+            os.remove(self._path("leases", item["id"]))
+        except FileNotFoundError:
+            # Lease expired and was reclaimed; the item may be processed twice but outputs are idempotent
+            logger.warning("Lease for %s was lost before completion", item["id"])
+
+
+class LeaseKeeper:
+    # Renews a lease in the background while the worker is busy with the item
+
+    def __init__(self, queue, item_id):
+        self.queue = queue
+        self.item_id = item_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            if not self.queue.renew(self.item_id):
+                logger.warning("Lease for %s disappeared while processing", self.item_id)
+                return
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(queue, process_item, poll_interval=2.0, once=False, stop_event=None):
+    # Claim and process items until the queue is empty (once=True) or forever
+    me = worker_id()
+    processed = 0
+    while stop_event is None or not stop_event.is_set():
+        queue.reclaim_expired()
+        item = queue.claim()
+        if item is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        logger.info("%s processing %s", me, item["path"])
+        start = time.perf_counter()
+        try:
+            with LeaseKeeper(queue, item["id"]):
+                # process_item may return extra details to record with the item
+                details = process_item(item) or {}
+            queue.complete(item, worker=me, duration=time.perf_counter() - start, **details)
+        except Exception as e:
+            logger.error("%s failed on %s: %s", me, item["path"], e)
+            queue.fail(item, str(e), worker=me, duration=time.perf_counter() - start)
+        processed += 1
+
+    return processed